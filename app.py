@@ -1,10 +1,12 @@
 # home.py
 import streamlit as st
-from src.config.supabase_manager import SupabaseManager
+from src.config.supabase_manager import obtener_manager
+from src.config.instrumentacion import obtener_instrumentacion
 from src.ui.sesiones import sesiones_ui
 from src.ui.sesion_actual import sesion_actual_ui  # Nueva importación
 from src.ui.evaluaciones import evaluaciones_ui
 from src.ui.importacion import importacion_ui
+from src.ui.rendimiento import rendimiento_ui
 
 st.set_page_config(
     page_title="Sistema de Participaciones v2",
@@ -15,20 +17,29 @@ st.set_page_config(
 def main():
     st.title("Sistema de Participaciones v2")
     
-    # Inicializar conexión con Supabase
-    if 'db' not in st.session_state:
-        st.session_state.db = SupabaseManager()
+    # Conexión con Supabase compartida por todo el proceso
+    db = obtener_manager()
     
     # Menú principal actualizado
     menu_options = {
         "Importar Curso": importacion_ui,
         "Sesiones": sesiones_ui,
         "Sesión Actual": sesion_actual_ui,  # Nueva opción
-        "Evaluaciones": evaluaciones_ui
+        "Evaluaciones": evaluaciones_ui,
+        "Rendimiento": rendimiento_ui
     }
     
     opcion = st.sidebar.radio("Selecciona una opción", list(menu_options.keys()))
-    menu_options[opcion](st.session_state.db)
+    
+    # Una unidad de trabajo por rerun: deduplica lecturas y agrupa escrituras
+    # La instrumentación agrupa las consultas de la ejecución por página
+    with obtener_instrumentacion().ejecucion(opcion) as ejecucion, db.unidad_de_trabajo() as unidad:
+        menu_options[opcion](db)
+    
+    st.sidebar.caption(f"⚡ Consultas ahorradas en esta ejecución: {unidad.consultas_ahorradas()}")
+    st.sidebar.caption(
+        f"📡 {ejecucion['consultas']} consultas · {ejecucion['tiempo'] * 1000:.0f} ms en esta ejecución"
+    )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
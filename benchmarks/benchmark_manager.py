@@ -0,0 +1,179 @@
+"""
+Benchmark de las operaciones principales de SupabaseManager sobre un backend en memoria
+
+Cada caso combina tamaño del padrón, cantidad de sesiones y ancho de la evaluación
+(sesiones que incluye). Por operación se mide el tiempo local (mediana), las
+solicitudes al backend, el tiempo de red simulado y el pico de memoria.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.benchmark_manager
+    python -m benchmarks.benchmark_manager --alumnos 30 150 --sesiones 10 40 --ancho 5
+    python -m benchmarks.benchmark_manager --guardar benchmarks/base.json
+    python -m benchmarks.benchmark_manager --comparar benchmarks/base.json
+"""
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+
+import pandas as pd
+
+from src.config.cliente_simulado import LATENCIA_WAN, VARIACION_WAN, ClienteSimulado
+from src.config.supabase_manager import SupabaseManager
+from src.utils.datos_sinteticos import generar_curso
+
+CODIGO_CURSO = 'BENCH'
+
+# Tablas cuyas lecturas cacheadas se descartan antes de cada medición
+TABLAS = ['cursos', 'alumnos', 'sesiones', 'puntajes', 'evaluaciones', 'evaluaciones_sesiones']
+
+# Aumento relativo a partir del cual una métrica se considera regresión
+TOLERANCIA = 0.20
+
+# Diferencia mínima de tiempo (s) para considerar regresión; evita falsos positivos por ruido
+MIN_DIFERENCIA_TIEMPO = 0.002
+
+
+def poblar_curso(cliente, alumnos, sesiones, ancho, semilla=0):
+    """Crea el curso del caso con datos sintéticos y una evaluación de `ancho` sesiones"""
+    creado = generar_curso(cliente, CODIGO_CURSO, 'Curso de benchmark', alumnos, sesiones, [ancho], semilla=semilla)
+    return {'sesiones': creado['sesiones'], 'evaluacion_id': creado['evaluaciones'][0]}
+
+
+def enfriar(db):
+    """Descarta las cachés del manager para medir cada operación en frío"""
+    db.cache.invalidar_tablas(TABLAS)
+    db._cache_cursos.invalidar()
+    db._cache_padrones.invalidar()
+    db._cache_sesiones.invalidar()
+
+
+def operaciones(db, datos):
+    """Operaciones a medir: nombre → función sin argumentos"""
+    df_alumnos = db.leer_alumnos_curso(CODIGO_CURSO)
+    df_alumnos['Puntaje'] = 7
+    sesion_id = datos['sesiones'][0]
+    df_puntajes = db.obtener_puntajes_sesion(sesion_id)
+    df_puntajes['Puntaje'] = (df_puntajes['Puntaje'] + 1) % 11
+    nuevas = itertools.count(1)
+
+    return {
+        'leer_alumnos_curso': lambda: db.leer_alumnos_curso(CODIGO_CURSO),
+        'guardar_sesion': lambda: db.guardar_sesion(
+            CODIGO_CURSO, f'Nueva {next(nuevas)}', 10, date(2025, 1, 1), df_alumnos
+        ),
+        'obtener_puntajes_sesion': lambda: db.obtener_puntajes_sesion(sesion_id),
+        'actualizar_puntajes_sesion': lambda: db.actualizar_puntajes_sesion(sesion_id, df_puntajes),
+        'obtener_evaluaciones_curso': lambda: db.obtener_evaluaciones_curso(CODIGO_CURSO),
+        'obtener_resultados_evaluacion': lambda: db.obtener_resultados_evaluacion(datos['evaluacion_id']),
+    }
+
+
+def medir(db, cliente, funcion, repeticiones):
+    """Mediana del tiempo local, solicitudes, tiempo de red simulado y pico de memoria"""
+    tiempos = []
+    for _ in range(repeticiones):
+        enfriar(db)
+        cliente.reiniciar_contadores()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    llamadas, tiempo_red = cliente.total_llamadas, cliente.tiempo_simulado
+
+    # La memoria se mide aparte: tracemalloc hace más lenta la ejecución
+    enfriar(db)
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'tiempo_s': round(statistics.median(tiempos), 6),
+        'llamadas': llamadas,
+        'tiempo_red_s': round(tiempo_red, 3),
+        'memoria_pico_kb': round(pico / 1024, 1)
+    }
+
+
+def ejecutar_caso(alumnos, sesiones, ancho, repeticiones, latencia, semilla):
+    cliente = ClienteSimulado(latencia=latencia, variacion=VARIACION_WAN if latencia else 0.0,
+                              semilla=semilla, dormir=False)
+    datos = poblar_curso(cliente.cliente, alumnos, sesiones, min(ancho, sesiones), semilla)
+    db = SupabaseManager(cliente)
+
+    caso = f"alumnos={alumnos},sesiones={sesiones},ancho={ancho}"
+    resultados = []
+    for nombre, funcion in operaciones(db, datos).items():
+        resultados.append({'caso': caso, 'operacion': nombre, **medir(db, cliente, funcion, repeticiones)})
+        print(f"  {caso:<38} {nombre:<30} {resultados[-1]['tiempo_s'] * 1000:9.1f} ms "
+              f"{resultados[-1]['llamadas']:5d} solicitudes", file=sys.stderr)
+    return resultados
+
+
+def comparar(resultados, ruta_base, tolerancia=TOLERANCIA):
+    """Compara con una línea base; retorna la tabla y si hubo regresiones"""
+    with open(ruta_base, encoding='utf-8') as archivo:
+        base = pd.DataFrame(json.load(archivo)['resultados'])
+    actual = pd.DataFrame(resultados)
+
+    tabla = actual.merge(base, on=['caso', 'operacion'], suffixes=('', '_base'))
+    regresion = pd.Series(False, index=tabla.index)
+    for metrica in ['tiempo_s', 'llamadas', 'memoria_pico_kb']:
+        cambio = tabla[metrica] / tabla[f'{metrica}_base'].where(tabla[f'{metrica}_base'] > 0) - 1
+        tabla[f'{metrica}_cambio'] = cambio.round(3)
+        if metrica == 'tiempo_s':
+            cambio = cambio.where(tabla[metrica] - tabla[f'{metrica}_base'] > MIN_DIFERENCIA_TIEMPO, 0)
+        regresion |= cambio > tolerancia
+    tabla['regresion'] = regresion
+    return tabla, bool(regresion.any())
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--alumnos', type=int, nargs='+', default=[30, 150, 1000, 10000])
+    parser.add_argument('--sesiones', type=int, nargs='+', default=[20])
+    parser.add_argument('--ancho', type=int, nargs='+', default=[5])
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--latencia', type=float, default=LATENCIA_WAN,
+                        help='latencia simulada por solicitud en segundos (no se espera)')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--guardar', help='archivo JSON donde guardar los resultados')
+    parser.add_argument('--comparar', help='línea base JSON contra la cual comparar')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA)
+    args = parser.parse_args(argumentos)
+
+    resultados = []
+    for alumnos, sesiones, ancho in itertools.product(args.alumnos, args.sesiones, args.ancho):
+        resultados.extend(ejecutar_caso(alumnos, sesiones, ancho, args.repeticiones, args.latencia, args.semilla))
+
+    print(pd.DataFrame(resultados).to_string(index=False))
+
+    if args.guardar:
+        with open(args.guardar, 'w', encoding='utf-8') as archivo:
+            json.dump({
+                'fecha': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'latencia': args.latencia,
+                'repeticiones': args.repeticiones,
+                'resultados': resultados
+            }, archivo, ensure_ascii=False, indent=2)
+        print(f"\nResultados guardados en {args.guardar}")
+
+    if args.comparar:
+        tabla, hay_regresion = comparar(resultados, args.comparar, args.tolerancia)
+        columnas = ['caso', 'operacion', 'tiempo_s_cambio', 'llamadas_cambio', 'memoria_pico_kb_cambio', 'regresion']
+        print(f"\nComparación con {args.comparar} (tolerancia {args.tolerancia:.0%}):")
+        print(tabla[columnas].to_string(index=False))
+        if hay_regresion:
+            print("\n⚠️ Hay regresiones respecto de la línea base")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Llena un backend con cursos sintéticos para pruebas de carga y escala
+
+Uso (desde la raíz del proyecto):
+    python -m scripts.generar_datos --sqlite datos.sqlite3 --cursos 20 --alumnos 500 --sesiones 25
+    python -m scripts.generar_datos --cursos 2 --alumnos 40 --sesiones 30   # backend de secrets.toml
+"""
+import argparse
+import sys
+import time
+
+from src.config.almacenamiento_sqlite import ClienteSQLite
+from src.utils.datos_sinteticos import generar_datos
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cursos', type=int, default=3)
+    parser.add_argument('--alumnos', type=int, default=40, help='alumnos por curso')
+    parser.add_argument('--sesiones', type=int, default=30, help='sesiones por curso')
+    parser.add_argument('--evaluaciones', type=int, default=3, help='evaluaciones parciales por curso (más un final)')
+    parser.add_argument('--prefijo', default='SIN', help='prefijo de los códigos de curso')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--sqlite', help='archivo SQLite a llenar; si se omite se usa el backend configurado')
+    args = parser.parse_args()
+    
+    if args.sqlite:
+        cliente = ClienteSQLite(args.sqlite)
+    else:
+        from src.config.supabase_manager import crear_cliente
+        cliente = crear_cliente()
+    
+    inicio = time.perf_counter()
+    try:
+        totales = generar_datos(
+            cliente, args.cursos, args.alumnos, args.sesiones,
+            args.evaluaciones, args.prefijo, args.semilla
+        )
+    except Exception as e:
+        # Otro proceso creó el mismo código entre la verificación y la inserción
+        if 'unique' not in str(e).lower() and 'duplicate' not in str(e).lower():
+            raise
+        sys.exit(f"Ya existe un curso con uno de los códigos generados ({e}). "
+                 f"Vuelva a ejecutar o use otro --prefijo.")
+    print(f"Datos generados en {time.perf_counter() - inicio:.1f} s:")
+    for tabla, cantidad in totales.items():
+        print(f"  {tabla}: {cantidad}")
+
+if __name__ == "__main__":
+    main()
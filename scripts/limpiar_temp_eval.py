@@ -0,0 +1,18 @@
+"""
+Elimina las evaluaciones 'temp_eval' que dejaba la previsualización anterior
+
+Uso (desde la raíz del proyecto, con .streamlit/secrets.toml configurado):
+    python -m scripts.limpiar_temp_eval
+"""
+from src.config.supabase_manager import SupabaseManager
+
+def main():
+    db = SupabaseManager()
+    eliminadas = db.limpiar_evaluaciones_temporales()
+    if eliminadas is None:
+        print("No se pudieron limpiar las evaluaciones temporales")
+    else:
+        print(f"Evaluaciones temporales eliminadas: {eliminadas}")
+
+if __name__ == "__main__":
+    main()
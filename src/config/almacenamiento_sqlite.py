@@ -0,0 +1,376 @@
+import os
+import re
+import sqlite3
+import threading
+
+# Carpeta con los scripts SQL del proyecto
+CARPETA_SQL = os.path.join(os.path.dirname(__file__), 'sql')
+
+# Claves foráneas del esquema: (tabla, columna) → tabla referenciada
+# Con ellas se resuelven selecciones anidadas como 'alumnos(apellido, nombre)'
+CLAVES_FORANEAS = {
+    ('alumnos', 'curso_id'): 'cursos',
+    ('sesiones', 'curso_id'): 'cursos',
+    ('puntajes', 'sesion_id'): 'sesiones',
+    ('puntajes', 'alumno_id'): 'alumnos',
+    ('evaluaciones', 'curso_id'): 'cursos',
+    ('evaluaciones_sesiones', 'evaluacion_id'): 'evaluaciones',
+    ('evaluaciones_sesiones', 'sesion_id'): 'sesiones',
+}
+
+# Máximo de parámetros por sentencia que acepta SQLite
+MAX_PARAMETROS = 999
+
+_IDENTIFICADOR = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+class ErrorSQLite(Exception):
+    """Error de una consulta al backend SQLite (equivalente a APIError de postgrest)"""
+
+
+def _leer_sql(nombre):
+    with open(os.path.join(CARPETA_SQL, nombre), encoding='utf-8') as archivo:
+        return archivo.read()
+
+
+def _columna(nombre):
+    """Valida un nombre de tabla o columna y lo retorna entre comillas"""
+    nombre = nombre.strip()
+    if not _IDENTIFICADOR.match(nombre):
+        raise ErrorSQLite(f"Identificador no válido: {nombre!r}")
+    return f'"{nombre}"'
+
+
+def _dividir_nivel_superior(texto):
+    """Divide por las comas que no están dentro de paréntesis"""
+    partes, actual, nivel = [], '', 0
+    for caracter in texto:
+        if caracter == ',' and nivel == 0:
+            partes.append(actual)
+            actual = ''
+            continue
+        nivel += (caracter == '(') - (caracter == ')')
+        actual += caracter
+    partes.append(actual)
+    return [parte.strip() for parte in partes if parte.strip()]
+
+
+def _parsear_seleccion(texto):
+    """'id, alumnos(apellido, nombre)' → ['id', ('alumnos', ['apellido', 'nombre'])]"""
+    seleccion = []
+    for parte in _dividir_nivel_superior(texto):
+        if '(' in parte:
+            tabla, resto = parte.split('(', 1)
+            seleccion.append((tabla.strip(), _parsear_seleccion(resto[:resto.rindex(')')])))
+        else:
+            seleccion.append(parte)
+    return seleccion
+
+
+class RespuestaSQLite:
+    """Respuesta con la misma forma que la de postgrest"""
+
+    def __init__(self, data):
+        self.data = data
+
+
+class ConsultaSQLite:
+    """
+    Constructor de consultas con la misma interfaz encadenable que postgrest:
+    table(...).select/insert/upsert/update/delete, filtros eq/in_/..., order,
+    limit, range y single, terminando en execute()
+    """
+
+    def __init__(self, cliente, tabla):
+        self._cliente = cliente
+        self._tabla = tabla
+        self._operacion = 'select'
+        self._seleccion = '*'
+        self._datos = None
+        self._conflicto = None
+        self._filtros = []
+        self._parametros = []
+        self._orden = []
+        self._limite = None
+        self._desplazamiento = None
+        self._unico = False
+
+    def select(self, *columnas):
+        self._operacion = 'select'
+        self._seleccion = ', '.join(columnas) or '*'
+        return self
+
+    def insert(self, datos):
+        self._operacion = 'insert'
+        self._datos = datos
+        return self
+
+    def upsert(self, datos, on_conflict=''):
+        self._operacion = 'upsert'
+        self._datos = datos
+        self._conflicto = [col.strip() for col in on_conflict.split(',') if col.strip()] or ['id']
+        return self
+
+    def update(self, datos):
+        self._operacion = 'update'
+        self._datos = datos
+        return self
+
+    def delete(self):
+        self._operacion = 'delete'
+        return self
+
+    def _filtro(self, columna, operador, valor):
+        self._filtros.append(f"{_columna(columna)} {operador} ?")
+        self._parametros.append(valor)
+        return self
+
+    def eq(self, columna, valor):
+        return self._filtro(columna, '=', valor)
+
+    def neq(self, columna, valor):
+        return self._filtro(columna, '!=', valor)
+
+    def gt(self, columna, valor):
+        return self._filtro(columna, '>', valor)
+
+    def gte(self, columna, valor):
+        return self._filtro(columna, '>=', valor)
+
+    def lt(self, columna, valor):
+        return self._filtro(columna, '<', valor)
+
+    def lte(self, columna, valor):
+        return self._filtro(columna, '<=', valor)
+
+    def in_(self, columna, valores):
+        valores = list(valores)
+        if not valores:
+            self._filtros.append('0')
+            return self
+        self._filtros.append(f"{_columna(columna)} in ({', '.join('?' * len(valores))})")
+        self._parametros.extend(valores)
+        return self
+
+    def order(self, columna, desc=False):
+        self._orden.append(f"{_columna(columna)} {'desc' if desc else 'asc'}")
+        return self
+
+    def limit(self, cantidad):
+        self._limite = cantidad
+        return self
+
+    def range(self, inicio, fin):
+        self._desplazamiento = inicio
+        self._limite = fin - inicio + 1
+        return self
+
+    def single(self):
+        self._unico = True
+        return self
+
+    def _donde(self):
+        return f" where {' and '.join(self._filtros)}" if self._filtros else ''
+
+    def execute(self):
+        tabla = _columna(self._tabla)
+        if self._operacion == 'select':
+            datos = self._ejecutar_select(tabla)
+        elif self._operacion in ('insert', 'upsert'):
+            datos = self._ejecutar_insert(tabla)
+        elif self._operacion == 'update':
+            asignaciones = ', '.join(f"{_columna(col)} = ?" for col in self._datos)
+            datos = self._cliente._escribir([(
+                f"update {tabla} set {asignaciones}{self._donde()} returning *",
+                list(self._datos.values()) + self._parametros
+            )])
+        else:
+            datos = self._cliente._escribir([
+                (f"delete from {tabla}{self._donde()} returning *", self._parametros)
+            ])
+
+        if self._unico:
+            if len(datos) != 1:
+                raise ErrorSQLite(
+                    f"Se esperaba una fila y la consulta retornó {len(datos)} ({self._tabla})"
+                )
+            datos = datos[0]
+        return RespuestaSQLite(datos)
+
+    def _ejecutar_select(self, tabla):
+        sql = f"select * from {tabla}{self._donde()}"
+        if self._orden:
+            sql += f" order by {', '.join(self._orden)}"
+        if self._limite is not None or self._desplazamiento is not None:
+            sql += f" limit {int(self._limite if self._limite is not None else -1)}"
+            sql += f" offset {int(self._desplazamiento or 0)}"
+        filas = self._cliente._consultar(sql, self._parametros)
+        return self._cliente._proyectar(self._tabla, filas, _parsear_seleccion(self._seleccion))
+
+    def _ejecutar_insert(self, tabla):
+        filas = self._datos if isinstance(self._datos, list) else [self._datos]
+        if not filas:
+            return []
+
+        columnas = list(filas[0])
+        sql_columnas = ', '.join(_columna(col) for col in columnas)
+        marcadores = f"({', '.join('?' * len(columnas))})"
+        conflicto = ''
+        if self._operacion == 'upsert':
+            actualizar = [col for col in columnas if col not in self._conflicto]
+            conflicto = f" on conflict ({', '.join(_columna(c) for c in self._conflicto)}) "
+            if actualizar:
+                conflicto += 'do update set ' + ', '.join(
+                    f"{_columna(col)} = excluded.{_columna(col)}" for col in actualizar
+                )
+            else:
+                conflicto += 'do nothing'
+
+        # Inserciones de varias filas por sentencia, dentro de una sola transacción
+        por_sentencia = max(1, MAX_PARAMETROS // len(columnas))
+        sentencias = []
+        for inicio in range(0, len(filas), por_sentencia):
+            lote = filas[inicio:inicio + por_sentencia]
+            sentencias.append((
+                f"insert into {tabla} ({sql_columnas}) values "
+                f"{', '.join([marcadores] * len(lote))}{conflicto} returning *",
+                [fila.get(col) for fila in lote for col in columnas]
+            ))
+        return self._cliente._escribir(sentencias)
+
+
+class LlamadaSQLite:
+    """Llamada a una función (rpc) pendiente de execute()"""
+
+    def __init__(self, cliente, funcion, parametros):
+        self._cliente = cliente
+        self._funcion = funcion
+        self._parametros = parametros or {}
+
+    def execute(self):
+        funciones = {
+            'incrementar_puntaje': self._cliente._incrementar_puntaje,
+            'incrementar_puntajes_lote': self._cliente._incrementar_puntajes_lote,
+        }
+        if self._funcion not in funciones:
+            raise ErrorSQLite(f"La función {self._funcion} no existe")
+        return RespuestaSQLite(funciones[self._funcion](**self._parametros))
+
+
+class ClienteSQLite:
+    """
+    Backend local sobre SQLite con la interfaz del cliente de Supabase que usa
+    SupabaseManager (table(...) y rpc(...)), para despliegues de un solo salón
+    """
+
+    def __init__(self, ruta: str = ':memory:'):
+        self.ruta = ruta
+        self._lock = threading.RLock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._conexion.row_factory = sqlite3.Row
+        self._conexion.execute('pragma foreign_keys = on')
+        if ruta != ':memory:':
+            self._conexion.execute('pragma journal_mode = wal')
+            self._conexion.execute('pragma synchronous = normal')
+        self._conexion.executescript(_leer_sql('esquema_sqlite.sql'))
+        self._sql_incrementar = _leer_sql('incrementar_puntaje_sqlite.sql')
+
+    def table(self, nombre):
+        return ConsultaSQLite(self, nombre)
+
+    def rpc(self, funcion, parametros=None):
+        return LlamadaSQLite(self, funcion, parametros)
+
+    def _consultar(self, sql, parametros=()):
+        with self._lock:
+            return [dict(fila) for fila in self._conexion.execute(sql, parametros)]
+
+    def _escribir(self, sentencias):
+        """Ejecuta las sentencias en una transacción; si una falla no se aplica ninguna"""
+        filas = []
+        try:
+            with self._lock, self._conexion:
+                for sql, parametros in sentencias:
+                    filas.extend(dict(fila) for fila in self._conexion.execute(sql, parametros))
+        except sqlite3.Error as e:
+            raise ErrorSQLite(str(e)) from e
+        return filas
+
+    def _leer_por(self, tabla, columna, valores):
+        """Filas de la tabla cuya columna está en valores, consultando por tramos"""
+        valores = list(valores)
+        filas = []
+        for inicio in range(0, len(valores), MAX_PARAMETROS):
+            tramo = valores[inicio:inicio + MAX_PARAMETROS]
+            filas.extend(self._consultar(
+                f"select * from {_columna(tabla)} where {_columna(columna)} "
+                f"in ({', '.join('?' * len(tramo))}) order by id",
+                tramo
+            ))
+        return filas
+
+    def _proyectar(self, tabla, filas, seleccion):
+        """Aplica la selección (columnas y tablas anidadas) a las filas leídas"""
+        resultado = [{} for _ in filas]
+        for elemento in seleccion:
+            if elemento == '*':
+                for salida, fila in zip(resultado, filas):
+                    salida.update(fila)
+            elif isinstance(elemento, str):
+                if filas and elemento not in filas[0]:
+                    raise ErrorSQLite(f"La columna {tabla}.{elemento} no existe")
+                for salida, fila in zip(resultado, filas):
+                    salida[elemento] = fila[elemento]
+            else:
+                relacionada, subseleccion = elemento
+                for salida, valor in zip(resultado, self._embeber(tabla, relacionada, filas, subseleccion)):
+                    salida[relacionada] = valor
+        return resultado
+
+    def _embeber(self, tabla, relacionada, filas, seleccion):
+        """
+        Resuelve una tabla anidada para todas las filas con una sola consulta
+        Muchos a uno retorna un objeto por fila; uno a muchos, una lista
+        """
+        for (origen, columna), destino in CLAVES_FORANEAS.items():
+            if origen == tabla and destino == relacionada:
+                leidas = self._leer_por(relacionada, 'id', {f[columna] for f in filas if f[columna] is not None})
+                proyectadas = dict(zip((f['id'] for f in leidas), self._proyectar(relacionada, leidas, seleccion)))
+                return [proyectadas.get(fila[columna]) for fila in filas]
+
+        for (origen, columna), destino in CLAVES_FORANEAS.items():
+            if origen == relacionada and destino == tabla:
+                leidas = self._leer_por(relacionada, columna, {f['id'] for f in filas})
+                grupos = {}
+                for leida, proyectada in zip(leidas, self._proyectar(relacionada, leidas, seleccion)):
+                    grupos.setdefault(leida[columna], []).append(proyectada)
+                return [grupos.get(fila['id'], []) for fila in filas]
+
+        raise ErrorSQLite(f"No hay relación entre {tabla} y {relacionada}")
+
+    def _incrementar_puntaje(self, p_sesion_id, p_alumno_id, p_delta):
+        filas = self._escribir([(
+            self._sql_incrementar,
+            {'sesion_id': p_sesion_id, 'alumno_id': p_alumno_id, 'delta': p_delta}
+        )])
+        return filas[0]['puntaje'] if filas else None
+
+    def _incrementar_puntajes_lote(self, p_cambios):
+        """Aplica todos los deltas en una transacción; una fila por cambio, en el mismo orden"""
+        resultados = []
+        try:
+            with self._lock, self._conexion:
+                for cambio in p_cambios:
+                    fila = self._conexion.execute(self._sql_incrementar, {
+                        'sesion_id': cambio['sesion_id'],
+                        'alumno_id': cambio['alumno_id'],
+                        'delta': cambio['delta']
+                    }).fetchone()
+                    resultados.append({
+                        'sesion_id': cambio['sesion_id'],
+                        'alumno_id': cambio['alumno_id'],
+                        'puntaje': fila['puntaje'] if fila else None
+                    })
+        except sqlite3.Error as e:
+            raise ErrorSQLite(str(e)) from e
+        return resultados
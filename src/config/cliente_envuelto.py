@@ -0,0 +1,74 @@
+import threading
+
+# Métodos del constructor que definen el tipo de solicitud
+OPERACIONES = {'select', 'insert', 'upsert', 'update', 'delete'}
+
+# Métodos que no filtran filas (orden, paginación, forma de la respuesta)
+MODIFICADORES = {'order', 'limit', 'range', 'single', 'maybe_single', 'csv', 'explain'}
+
+
+def _describir_argumentos(args, kwargs):
+    partes = [repr(arg) if not isinstance(arg, (list, tuple, set)) else f"[{len(arg)} valores]" for arg in args]
+    partes += [f"{clave}={valor!r}" for clave, valor in kwargs.items()]
+    return ', '.join(partes)
+
+
+class ConsultaEnvuelta:
+    """
+    Envuelve un constructor de consultas y registra tabla, operación y filtros
+    El execute() final pasa por el cliente envuelto
+    """
+
+    def __init__(self, cliente, consulta, tabla, operacion='select'):
+        self._cliente = cliente
+        self._consulta = consulta
+        self._solicitud = {'tabla': tabla, 'operacion': operacion, 'filtros': [], 'modificadores': []}
+
+    def __getattr__(self, nombre):
+        atributo = getattr(self._consulta, nombre)
+        if not callable(atributo):
+            return atributo
+
+        def metodo(*args, **kwargs):
+            self._consulta = atributo(*args, **kwargs)
+            if nombre in OPERACIONES:
+                self._solicitud['operacion'] = nombre
+                if nombre != 'select' and args and isinstance(args[0], list):
+                    self._solicitud['filas_enviadas'] = len(args[0])
+            elif nombre in MODIFICADORES:
+                self._solicitud['modificadores'].append(f"{nombre}({_describir_argumentos(args, kwargs)})")
+            else:
+                self._solicitud['filtros'].append(f"{nombre}({_describir_argumentos(args, kwargs)})")
+            return self
+        return metodo
+
+    def execute(self):
+        return self._cliente._ejecutar(dict(self._solicitud), self._consulta.execute)
+
+
+class ClienteEnvuelto:
+    """
+    Envuelve un cliente con la interfaz de Supabase (table/rpc)
+    Cada execute() llama a al_ejecutar(solicitud, ejecutar), que debe retornar ejecutar()
+    solicitud: dict con 'tabla', 'operacion', 'filtros' y 'modificadores'
+    """
+
+    def __init__(self, cliente, al_ejecutar=None):
+        self.cliente = cliente
+        self._al_ejecutar = al_ejecutar
+        self._lock = threading.Lock()
+
+    def table(self, nombre):
+        return ConsultaEnvuelta(self, self.cliente.table(nombre), nombre)
+
+    def rpc(self, funcion, parametros=None):
+        return ConsultaEnvuelta(self, self.cliente.rpc(funcion, parametros or {}), funcion, 'rpc')
+
+    def _ejecutar(self, solicitud, ejecutar):
+        if self._al_ejecutar is None:
+            return ejecutar()
+        return self._al_ejecutar(solicitud, ejecutar)
+
+    def __getattr__(self, nombre):
+        # auth, storage y demás atributos del cliente original
+        return getattr(self.cliente, nombre)
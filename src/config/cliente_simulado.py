@@ -0,0 +1,48 @@
+import random
+import time
+from collections import Counter
+
+from .almacenamiento_sqlite import ClienteSQLite
+from .cliente_envuelto import ClienteEnvuelto
+
+# Latencia típica por solicitud contra Supabase desde el salón, en segundos
+LATENCIA_WAN = 0.08
+VARIACION_WAN = 0.03
+
+
+class ClienteSimulado(ClienteEnvuelto):
+    """
+    Cliente en memoria que imita a Supabase: los datos viven en SQLite y cada
+    solicitud suma una latencia configurable (latencia ± variacion, en segundos)
+    Con la misma semilla los retrasos son siempre los mismos
+    Con dormir=False no se espera: el retraso solo se acumula en tiempo_simulado
+    """
+
+    def __init__(self, latencia: float = LATENCIA_WAN, variacion: float = VARIACION_WAN,
+                 semilla: int = 0, dormir: bool = True, ruta: str = ':memory:'):
+        super().__init__(ClienteSQLite(ruta), self._simular)
+        self.latencia = latencia
+        self.variacion = variacion
+        self.dormir = dormir
+        self._azar = random.Random(semilla)
+        self.llamadas = Counter()
+        self.tiempo_simulado = 0.0
+
+    def _simular(self, solicitud, ejecutar):
+        with self._lock:
+            retraso = max(0.0, self.latencia + self._azar.uniform(-self.variacion, self.variacion))
+            self.llamadas[(solicitud['tabla'], solicitud['operacion'])] += 1
+            self.tiempo_simulado += retraso
+        if self.dormir and retraso:
+            time.sleep(retraso)
+        return ejecutar()
+
+    @property
+    def total_llamadas(self) -> int:
+        return sum(self.llamadas.values())
+
+    def reiniciar_contadores(self):
+        """Pone en cero las llamadas y el tiempo simulado (los datos se conservan)"""
+        with self._lock:
+            self.llamadas.clear()
+            self.tiempo_simulado = 0.0
@@ -0,0 +1,224 @@
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pandas as pd
+import streamlit as st
+
+from .supabase_manager import TAMANO_LOTE, obtener_manager
+
+# Carpeta donde se guarda el estado de cada importación
+CARPETA_TRABAJOS = '.importaciones'
+
+# Importaciones que pueden ejecutarse a la vez (por ejemplo, de cursos distintos)
+MAX_TRABAJOS_SIMULTANEOS = 4
+
+# Estados de un trabajo que todavía deben procesarse
+ESTADOS_ACTIVOS = ('pendiente', 'en_proceso')
+
+# Tiempo que se conserva un trabajo terminado (en memoria y en disco)
+RETENCION_TRABAJOS = timedelta(days=1)
+
+class ImportadorAlumnos:
+    """
+    Ejecuta importaciones de alumnos en segundo plano, bloque por bloque
+    El estado de cada trabajo (filas, avance, errores) se guarda en disco
+    después de cada bloque para poder reanudarlo si el proceso se reinicia
+    Al terminar se descartan sus filas; el resumen se conserva RETENCION_TRABAJOS
+    """
+
+    def __init__(self, db, carpeta: str = CARPETA_TRABAJOS, max_trabajos: int = MAX_TRABAJOS_SIMULTANEOS):
+        self.db = db
+        self.carpeta = carpeta
+        self._trabajos = {}
+        self._lock = threading.Lock()
+        self._hay_filas = threading.Condition(self._lock)
+        self._lock_disco = threading.Lock()
+        self._ejecutor = ThreadPoolExecutor(max_workers=max_trabajos, thread_name_prefix='importacion')
+        os.makedirs(carpeta, exist_ok=True)
+        self._reanudar_pendientes()
+
+    def abrir(self, codigo_curso) -> str:
+        """
+        Crea un trabajo vacío para el curso y lo encola; retorna su ID
+        Las filas se entregan después con agregar_filas y el trabajo termina al llamar cerrar
+        """
+        ahora = datetime.now().isoformat(timespec='seconds')
+        trabajo = {
+            'id': uuid.uuid4().hex,
+            'codigo_curso': codigo_curso,
+            'filas': [],
+            'recibiendo': True,
+            'desplazamiento': 0,
+            'conteo': {'Agregado': 0, 'Duplicado': 0, 'Error': 0},
+            'errores': [],
+            'estado': 'pendiente',
+            'mensaje': '',
+            'creado': ahora,
+            'actualizado': ahora
+        }
+        self._purgar_terminados()
+        with self._lock:
+            self._trabajos[trabajo['id']] = trabajo
+        self._guardar(trabajo)
+        self._ejecutor.submit(self._ejecutar, trabajo['id'])
+        return trabajo['id']
+
+    def agregar_filas(self, trabajo_id, df_alumnos, rechazados=None):
+        """
+        Entrega un bloque de alumnos al trabajo; el trabajador lo procesa en cuanto llega
+        rechazados: filas descartadas por la validación, que se informan como Error
+        """
+        trabajo = self._trabajos[trabajo_id]
+        with self._hay_filas:
+            trabajo['filas'].extend(df_alumnos[['Apellido', 'Nombre']].astype(str).values.tolist())
+            for fila in rechazados or []:
+                trabajo['conteo']['Error'] += 1
+                trabajo['errores'].append({**fila, 'Estado': 'Error'})
+            self._hay_filas.notify_all()
+        self._guardar(trabajo)
+
+    def cerrar(self, trabajo_id, error=None):
+        """
+        Indica que el trabajo ya no recibirá más filas
+        error: motivo por el que la entrega se cortó antes de tiempo; el trabajo queda incompleto
+        """
+        trabajo = self._trabajos[trabajo_id]
+        with self._hay_filas:
+            trabajo['recibiendo'] = False
+            if error is not None:
+                trabajo['incompleto'] = True
+                trabajo['mensaje'] = f"La lectura se interrumpió ({error}); se importaron solo las filas recibidas"
+            self._hay_filas.notify_all()
+        self._guardar(trabajo)
+
+    def enviar(self, codigo_curso, df_alumnos) -> str:
+        """Encola la importación de df_alumnos en el curso; retorna el ID del trabajo"""
+        trabajo_id = self.abrir(codigo_curso)
+        self.agregar_filas(trabajo_id, df_alumnos)
+        self.cerrar(trabajo_id)
+        return trabajo_id
+
+    def estado(self, trabajo_id):
+        """Resumen del trabajo sin sus filas, o None si no existe"""
+        with self._lock:
+            trabajo = self._trabajos.get(trabajo_id)
+            if trabajo is None:
+                return None
+            resumen = {k: v for k, v in trabajo.items() if k != 'filas'}
+            resumen.setdefault('total', len(trabajo['filas']))
+            resumen['conteo'] = dict(trabajo['conteo'])
+            resumen['errores'] = list(trabajo['errores'])
+            return resumen
+
+    def _ejecutar(self, trabajo_id):
+        """Procesa el trabajo desde su último bloque confirmado"""
+        trabajo = self._trabajos[trabajo_id]
+        self._actualizar(trabajo, estado='en_proceso')
+        try:
+            while True:
+                # Espera nuevas filas mientras el trabajo siga recibiendo
+                with self._hay_filas:
+                    self._hay_filas.wait_for(
+                        lambda: trabajo['desplazamiento'] < len(trabajo['filas']) or not trabajo['recibiendo']
+                    )
+                    inicio = trabajo['desplazamiento']
+                    bloque = trabajo['filas'][inicio:inicio + TAMANO_LOTE]
+                if not bloque:
+                    break
+                
+                resultados = self.db.importar_alumnos_lote(
+                    trabajo['codigo_curso'],
+                    pd.DataFrame(bloque, columns=['Apellido', 'Nombre'])
+                )
+                if resultados is None:
+                    raise ValueError(f"No se encontró el curso con código {trabajo['codigo_curso']}")
+                
+                with self._lock:
+                    for resultado in resultados:
+                        trabajo['conteo'][resultado['Estado']] += 1
+                        if resultado['Estado'] != 'Agregado':
+                            trabajo['errores'].append(resultado)
+                    trabajo['desplazamiento'] = inicio + len(bloque)
+                self._actualizar(trabajo)
+            
+            self._actualizar(trabajo, estado='completado')
+        except Exception as e:
+            self._actualizar(trabajo, estado='error', mensaje=str(e))
+
+    def _actualizar(self, trabajo, **cambios):
+        with self._lock:
+            trabajo.update(cambios)
+            trabajo['actualizado'] = datetime.now().isoformat(timespec='seconds')
+            if trabajo['estado'] not in ESTADOS_ACTIVOS:
+                # Terminado: las filas ya no se necesitan, solo su cantidad
+                trabajo['total'] = len(trabajo['filas'])
+                trabajo['filas'] = []
+        self._guardar(trabajo)
+
+    def _purgar_terminados(self):
+        """Olvida y borra del disco los trabajos terminados hace más de RETENCION_TRABAJOS"""
+        limite = (datetime.now() - RETENCION_TRABAJOS).isoformat(timespec='seconds')
+        with self._lock:
+            vencidos = [
+                trabajo_id for trabajo_id, trabajo in self._trabajos.items()
+                if trabajo['estado'] not in ESTADOS_ACTIVOS and trabajo['actualizado'] < limite
+            ]
+            for trabajo_id in vencidos:
+                del self._trabajos[trabajo_id]
+        for trabajo_id in vencidos:
+            self._borrar(trabajo_id)
+
+    def _borrar(self, trabajo_id):
+        with self._lock_disco:
+            try:
+                os.remove(os.path.join(self.carpeta, f"{trabajo_id}.json"))
+            except OSError:
+                pass
+
+    def _guardar(self, trabajo):
+        """Escribe el estado del trabajo de forma atómica"""
+        ruta = os.path.join(self.carpeta, f"{trabajo['id']}.json")
+        with self._lock_disco:
+            with self._lock:
+                contenido = json.dumps(trabajo, ensure_ascii=False, default=str)
+            with open(ruta + '.tmp', 'w', encoding='utf-8') as archivo:
+                archivo.write(contenido)
+            os.replace(ruta + '.tmp', ruta)
+
+    def _reanudar_pendientes(self):
+        """
+        Carga los trabajos guardados, vuelve a encolar los que quedaron sin terminar
+        y borra los terminados que superaron la retención
+        """
+        for nombre in sorted(os.listdir(self.carpeta)):
+            if not nombre.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.carpeta, nombre), encoding='utf-8') as archivo:
+                    trabajo = json.load(archivo)
+            except (OSError, ValueError):
+                continue
+            self._trabajos[trabajo['id']] = trabajo
+            if trabajo['estado'] not in ESTADOS_ACTIVOS:
+                # Archivos de versiones anteriores aún guardaban las filas
+                if trabajo['filas']:
+                    trabajo['total'] = len(trabajo['filas'])
+                    trabajo['filas'] = []
+                    self._guardar(trabajo)
+            else:
+                # Quien entregaba las filas ya no existe: se importa lo recibido
+                if trabajo.get('recibiendo'):
+                    trabajo['recibiendo'] = False
+                    trabajo['incompleto'] = True
+                    trabajo['mensaje'] = 'La carga se interrumpió; se importaron solo las filas recibidas'
+                self._ejecutor.submit(self._ejecutar, trabajo['id'])
+        self._purgar_terminados()
+
+@st.cache_resource
+def obtener_importador():
+    """Retorna el importador en segundo plano compartido por todo el proceso"""
+    return ImportadorAlumnos(obtener_manager())
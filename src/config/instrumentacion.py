@@ -0,0 +1,162 @@
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from .cliente_envuelto import ClienteEnvuelto
+
+# Segundos a partir de los cuales una consulta se registra como lenta
+UMBRAL_CONSULTA_LENTA = 0.5
+
+# Solicitudes, ejecuciones y consultas lentas que se conservan en memoria
+MAX_SOLICITUDES = 5000
+MAX_EJECUCIONES = 200
+MAX_CONSULTAS_LENTAS = 100
+
+# Página asignada a las solicitudes fuera de una ejecución (fragmentos, hilos de fondo)
+SIN_PAGINA = '(fragmentos / segundo plano)'
+
+logger = logging.getLogger(__name__)
+
+
+def _contar_filas(data):
+    if data is None:
+        return 0
+    return len(data) if isinstance(data, list) else 1
+
+
+class Instrumentacion:
+    """
+    Mide cada solicitud del cliente de datos (tabla, operación, filtros, latencia,
+    filas y error) y la asocia a la ejecución y página en curso del hilo
+    """
+
+    def __init__(self, umbral_lento: float = UMBRAL_CONSULTA_LENTA):
+        self.umbral_lento = umbral_lento
+        self.solicitudes = deque(maxlen=MAX_SOLICITUDES)
+        self.ejecuciones = deque(maxlen=MAX_EJECUCIONES)
+        self.lentas = deque(maxlen=MAX_CONSULTAS_LENTAS)
+        self._hilo = threading.local()
+        self._lock = threading.Lock()
+        self._contador = itertools.count(1)
+
+    def envolver(self, cliente):
+        """Retorna el cliente envuelto para que cada execute() quede medido"""
+        return ClienteEnvuelto(cliente, self._medir)
+
+    @contextmanager
+    def ejecucion(self, pagina):
+        """
+        Agrupa las solicitudes de una ejecución (rerun) del script para la página indicada
+        Entrega un dict con consultas, tiempo, filas y errores que se actualiza en vivo
+        """
+        actual = {
+            'ejecucion': next(self._contador),
+            'pagina': pagina,
+            'hora': datetime.now(),
+            'consultas': 0,
+            'tiempo': 0.0,
+            'filas': 0,
+            'errores': 0
+        }
+        anterior = getattr(self._hilo, 'ejecucion', None)
+        self._hilo.ejecucion = actual
+        try:
+            yield actual
+        finally:
+            self._hilo.ejecucion = anterior
+            with self._lock:
+                self.ejecuciones.append(actual)
+
+    def _medir(self, solicitud, ejecutar):
+        inicio = time.perf_counter()
+        respuesta, error = None, None
+        try:
+            respuesta = ejecutar()
+            return respuesta
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            latencia = time.perf_counter() - inicio
+            actual = getattr(self._hilo, 'ejecucion', None)
+            registro = {
+                **solicitud,
+                'filtros': ', '.join(solicitud['filtros']),
+                'modificadores': ', '.join(solicitud['modificadores']),
+                'latencia': latencia,
+                'filas': _contar_filas(getattr(respuesta, 'data', None)),
+                'error': error,
+                'pagina': actual['pagina'] if actual else SIN_PAGINA,
+                'ejecucion': actual['ejecucion'] if actual else None,
+                'hora': datetime.now()
+            }
+            with self._lock:
+                self.solicitudes.append(registro)
+                if actual is not None:
+                    actual['consultas'] += 1
+                    actual['tiempo'] += latencia
+                    actual['filas'] += registro['filas']
+                    actual['errores'] += error is not None
+                if latencia >= self.umbral_lento:
+                    self.lentas.append(registro)
+            if latencia >= self.umbral_lento:
+                logger.warning(
+                    "Consulta lenta (%.0f ms): %s %s %s",
+                    latencia * 1000, registro['operacion'], registro['tabla'], registro['filtros']
+                )
+
+    def resumen_por_pagina(self) -> pd.DataFrame:
+        """Consultas, p50/p95 de latencia (ms), filas y errores por página"""
+        with self._lock:
+            df = pd.DataFrame(list(self.solicitudes))
+            df_ejecuciones = pd.DataFrame(list(self.ejecuciones))
+        if df.empty:
+            return pd.DataFrame()
+
+        df['latencia_ms'] = df['latencia'] * 1000
+        resumen = df.groupby('pagina').agg(
+            consultas=('latencia_ms', 'size'),
+            p50_ms=('latencia_ms', 'median'),
+            p95_ms=('latencia_ms', lambda serie: serie.quantile(0.95)),
+            filas=('filas', 'sum'),
+            errores=('error', 'count')
+        )
+        if not df_ejecuciones.empty:
+            por_ejecucion = df_ejecuciones.groupby('pagina')['consultas']
+            resumen['ejecuciones'] = por_ejecucion.size()
+            resumen['consultas_por_ejecucion'] = por_ejecucion.mean()
+        return resumen.reset_index().round(1)
+
+    def resumen_por_tabla(self) -> pd.DataFrame:
+        """Consultas y p50/p95 de latencia (ms) por tabla y operación"""
+        with self._lock:
+            df = pd.DataFrame(list(self.solicitudes))
+        if df.empty:
+            return pd.DataFrame()
+
+        df['latencia_ms'] = df['latencia'] * 1000
+        return df.groupby(['tabla', 'operacion']).agg(
+            consultas=('latencia_ms', 'size'),
+            p50_ms=('latencia_ms', 'median'),
+            p95_ms=('latencia_ms', lambda serie: serie.quantile(0.95)),
+            filas=('filas', 'sum')
+        ).reset_index().sort_values('consultas', ascending=False).round(1)
+
+    def reiniciar(self):
+        with self._lock:
+            self.solicitudes.clear()
+            self.ejecuciones.clear()
+            self.lentas.clear()
+
+
+@st.cache_resource
+def obtener_instrumentacion():
+    """Retorna la instrumentación compartida por todo el proceso"""
+    return Instrumentacion()
@@ -0,0 +1,52 @@
+-- Esquema local equivalente al de Supabase para el backend SQLite.
+-- Se aplica al abrir la base de datos; es seguro ejecutarlo varias veces.
+
+create table if not exists cursos (
+    id integer primary key autoincrement,
+    nombre text not null,
+    codigo text not null unique
+);
+
+create table if not exists alumnos (
+    id integer primary key autoincrement,
+    curso_id integer not null references cursos (id),
+    apellido text not null,
+    nombre text not null
+);
+create index if not exists alumnos_curso_idx on alumnos (curso_id, apellido);
+
+create table if not exists sesiones (
+    id integer primary key autoincrement,
+    curso_id integer not null references cursos (id),
+    nombre text not null,
+    fecha text not null,
+    puntaje_maximo integer not null
+);
+create index if not exists sesiones_curso_fecha_idx on sesiones (curso_id, fecha);
+
+create table if not exists puntajes (
+    id integer primary key autoincrement,
+    sesion_id integer not null references sesiones (id),
+    alumno_id integer not null references alumnos (id),
+    puntaje integer not null default 0
+);
+create unique index if not exists puntajes_sesion_alumno_key on puntajes (sesion_id, alumno_id);
+create index if not exists puntajes_alumno_idx on puntajes (alumno_id);
+
+create table if not exists evaluaciones (
+    id integer primary key autoincrement,
+    curso_id integer not null references cursos (id),
+    nombre text not null,
+    escala numeric not null,
+    fecha text not null
+);
+create index if not exists evaluaciones_curso_fecha_idx on evaluaciones (curso_id, fecha);
+create index if not exists evaluaciones_nombre_idx on evaluaciones (nombre);
+
+create table if not exists evaluaciones_sesiones (
+    id integer primary key autoincrement,
+    evaluacion_id integer not null references evaluaciones (id),
+    sesion_id integer not null references sesiones (id)
+);
+create index if not exists evaluaciones_sesiones_evaluacion_idx on evaluaciones_sesiones (evaluacion_id);
+create index if not exists evaluaciones_sesiones_sesion_idx on evaluaciones_sesiones (sesion_id);
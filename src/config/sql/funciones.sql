@@ -0,0 +1,38 @@
+-- Funciones y restricciones que SupabaseManager espera en la base de datos.
+-- Ejecutar en el editor SQL de Supabase.
+
+-- Un solo puntaje por alumno y sesión (requerido por los upserts masivos)
+create unique index if not exists puntajes_sesion_alumno_key
+    on puntajes (sesion_id, alumno_id);
+
+-- Suma p_delta al puntaje de un alumno en una sesión de forma atómica.
+-- El resultado se acota a [0, puntaje_maximo] de la sesión y se retorna.
+create or replace function incrementar_puntaje(
+    p_sesion_id bigint,
+    p_alumno_id bigint,
+    p_delta integer
+)
+returns integer
+language sql
+as $$
+    insert into puntajes (sesion_id, alumno_id, puntaje)
+    select s.id, p_alumno_id, greatest(0, least(s.puntaje_maximo, p_delta))
+    from sesiones s
+    where s.id = p_sesion_id
+    on conflict (sesion_id, alumno_id) do update
+        set puntaje = greatest(0, least(
+            (select s.puntaje_maximo from sesiones s where s.id = excluded.sesion_id),
+            puntajes.puntaje + p_delta
+        ))
+    returning puntaje;
+$$;
+
+-- Aplica en una sola llamada varios deltas de puntaje ya agrupados.
+-- p_cambios: [{"sesion_id": 1, "alumno_id": 2, "delta": 3}, ...]
+create or replace function incrementar_puntajes_lote(p_cambios jsonb)
+returns table (sesion_id bigint, alumno_id bigint, puntaje integer)
+language sql
+as $$
+    select c.sesion_id, c.alumno_id, incrementar_puntaje(c.sesion_id, c.alumno_id, c.delta)
+    from jsonb_to_recordset(p_cambios) as c(sesion_id bigint, alumno_id bigint, delta integer);
+$$;
@@ -0,0 +1,12 @@
+-- Equivalente local de la función incrementar_puntaje para SQLite (>= 3.35).
+-- Parámetros con nombre: :sesion_id, :alumno_id, :delta
+insert into puntajes (sesion_id, alumno_id, puntaje)
+select s.id, :alumno_id, max(0, min(s.puntaje_maximo, :delta))
+from sesiones s
+where s.id = :sesion_id
+on conflict (sesion_id, alumno_id) do update
+    set puntaje = max(0, min(
+        (select s.puntaje_maximo from sesiones s where s.id = excluded.sesion_id),
+        puntajes.puntaje + :delta
+    ))
+returning puntaje;
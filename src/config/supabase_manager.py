@@ -1,27 +1,558 @@
 import streamlit as st
 from supabase import create_client
 import pandas as pd
+import copy
+import functools
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 from datetime import datetime
+from .almacenamiento_sqlite import ClienteSQLite
+from .cliente_simulado import LATENCIA_WAN, ClienteSimulado
+from .instrumentacion import obtener_instrumentacion
+from ..utils.validators import calcular_resultados_evaluacion, clave_alumno, construir_matriz_puntajes
+
+# Máximo de filas que PostgREST devuelve por solicitud
+TAMANO_PAGINA = 1000
+
+# Máximo de filas enviadas en cada upsert masivo
+TAMANO_LOTE = 500
+
+# Segundos entre vaciados automáticos de la escritura diferida de puntajes
+INTERVALO_ESCRITURA = 2.0
+
+# Espera máxima (s) entre reintentos de un vaciado fallido; se duplica en cada fallo
+ESPERA_MAXIMA_REINTENTO = 60.0
+
+# Clave de st.session_state que identifica la cola de escritura diferida de cada navegador
+CLAVE_COLA_PUNTAJES = 'cola_puntajes_id'
+
+# Segundos sin clics tras los cuales una cola vacía de otra sesión se descarta
+TTL_COLAS_INACTIVAS = 600
+
+# Segundos que se conserva la relación código → ID de un curso
+TTL_CURSOS = 300
+
+# Segundos que se conserva el padrón indexado de un curso
+TTL_PADRONES = 300
+
+# Segundos que se conservan las lecturas cacheadas (los puntajes cambian más seguido)
+TTL_LECTURA = 120
+TTL_LECTURA_PUNTAJES = 30
+
+# Máximo de lecturas distintas en la caché de consultas
+MAX_ENTRADAS_CACHE = 256
+
+# Archivo de la base de datos local cuando el backend es SQLite
+RUTA_SQLITE = 'datos.sqlite3'
+
+class CacheTTL:
+    """Caché clave → valor con expiración, compartida entre hilos"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._datos = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        """Retorna el valor vigente para la clave o None si no existe o expiró"""
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            valor, expira = entrada
+            if time.monotonic() >= expira:
+                del self._datos[clave]
+                return None
+            return valor
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = (valor, time.monotonic() + self.ttl)
+
+    def invalidar(self, clave=None):
+        """Elimina una clave o, si no se indica, toda la caché"""
+        with self._lock:
+            if clave is None:
+                self._datos.clear()
+            else:
+                self._datos.pop(clave, None)
+
+class CacheConsultas:
+    """
+    Caché LRU de resultados de lectura, segura para hilos
+    Cada entrada tiene su propio TTL y las tablas de las que depende
+    Cada tabla lleva una generación que aumenta al invalidarla, para descartar
+    resultados leídos mientras otra escritura los volvía obsoletos
+    """
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS_CACHE):
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self._por_metodo = {}
+        self._generaciones = {}
+        self.invalidaciones = 0
+
+    def _contar(self, metodo, campo):
+        contadores = self._por_metodo.setdefault(metodo, {'aciertos': 0, 'fallos': 0})
+        contadores[campo] += 1
+
+    def obtener(self, clave):
+        """Retorna (True, valor) si la clave está vigente o (False, None)"""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and time.monotonic() < entrada[1]:
+                self._entradas.move_to_end(clave)
+                self._contar(clave[0], 'aciertos')
+                return True, entrada[0]
+            if entrada is not None:
+                del self._entradas[clave]
+            self._contar(clave[0], 'fallos')
+            return False, None
+
+    def generaciones(self, tablas):
+        """Generación actual de cada tabla, en el orden indicado"""
+        with self._lock:
+            return tuple(self._generaciones.get(tabla, 0) for tabla in tablas)
+
+    def guardar(self, clave, valor, ttl, tablas, generaciones=None):
+        """
+        Guarda el resultado; si se indican las generaciones leídas antes de consultar
+        y alguna tabla se invalidó desde entonces, el resultado no se guarda
+        """
+        with self._lock:
+            if generaciones is not None and generaciones != tuple(self._generaciones.get(t, 0) for t in tablas):
+                return False
+            self._entradas[clave] = (valor, time.monotonic() + ttl, frozenset(tablas))
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+            return True
+
+    def invalidar_tablas(self, tablas):
+        """Elimina solo las entradas que dependen de alguna de las tablas"""
+        tablas = set(tablas)
+        with self._lock:
+            for tabla in tablas:
+                self._generaciones[tabla] = self._generaciones.get(tabla, 0) + 1
+            for clave in [c for c, e in self._entradas.items() if e[2] & tablas]:
+                del self._entradas[clave]
+                self.invalidaciones += 1
+
+    def estadisticas(self):
+        """Contadores de aciertos y fallos, totales y por método"""
+        with self._lock:
+            por_metodo = {m: dict(c) for m, c in self._por_metodo.items()}
+            aciertos = sum(c['aciertos'] for c in por_metodo.values())
+            fallos = sum(c['fallos'] for c in por_metodo.values())
+            return {
+                'aciertos': aciertos,
+                'fallos': fallos,
+                'tasa_aciertos': aciertos / (aciertos + fallos) if aciertos + fallos else 0.0,
+                'invalidaciones': self.invalidaciones,
+                'entradas': len(self._entradas),
+                'por_metodo': por_metodo
+            }
+
+def _clave_hashable(valor):
+    """Convierte listas y diccionarios de argumentos en tuplas para usarlos como clave"""
+    if isinstance(valor, (list, tuple)):
+        return tuple(_clave_hashable(v) for v in valor)
+    if isinstance(valor, dict):
+        return tuple(sorted((k, _clave_hashable(v)) for k, v in valor.items()))
+    return valor
+
+class UnidadDeTrabajo:
+    """
+    Alcance de una ejecución (rerun) de Streamlit
+    Deduplica lecturas idénticas, sirve filas ya leídas por clave primaria
+    y agrupa las escrituras de puntajes para enviarlas en lote al cerrar
+    Los clics de los fragmentos no pasan por la unidad: se escriben al momento o por ColaPuntajes
+    """
 
-class SupabaseManager:
     def __init__(self):
-        self.supabase_url = st.secrets["supabase_url"]
-        self.supabase_key = st.secrets["supabase_key"]
-        self.client = create_client(self.supabase_url, self.supabase_key)
+        self.lecturas = {}
+        self.mapa_identidad = {}
+        self.escrituras = {}
+        self.estadisticas = {
+            'lecturas': 0,
+            'lecturas_deduplicadas': 0,
+            'filas_del_mapa': 0,
+            'escrituras_agrupadas': 0,
+            'lotes_enviados': 0
+        }
+
+    def invalidar(self, tablas):
+        tablas = set(tablas)
+        self.lecturas = {c: e for c, e in self.lecturas.items() if not e[1] & tablas}
+        self.mapa_identidad = {c: f for c, f in self.mapa_identidad.items() if c[0] not in tablas}
+
+    def consultas_ahorradas(self) -> int:
+        """Consultas que no llegaron a la caché ni a la base de datos gracias a la unidad"""
+        e = self.estadisticas
+        return (e['lecturas_deduplicadas'] + e['filas_del_mapa']
+                + max(0, e['escrituras_agrupadas'] - e['lotes_enviados']))
+
+def _lectura_cacheada(ttl, *tablas, identidades=None, superponer=None):
+    """
+    Cachea el resultado de un método de lectura según sus argumentos
+    identidades(valor) puede retornar pares ((tabla, id), fila) para el mapa de identidad
+    superponer(unidad, valor, *args) aplica sobre el resultado las escrituras pendientes de la unidad;
+    sin él, una lectura de puntajes envía antes las escrituras pendientes
+    """
+    def decorador(metodo):
+        @functools.wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            clave = (metodo.__name__, _clave_hashable(args), _clave_hashable(kwargs))
+            unidad = self.unidad_actual()
+            if unidad is not None:
+                # La lectura debe ver lo escrito antes en la misma ejecución
+                if unidad.escrituras and 'puntajes' in tablas and superponer is None:
+                    self._confirmar_unidad(unidad)
+                unidad.estadisticas['lecturas'] += 1
+                if clave in unidad.lecturas:
+                    unidad.estadisticas['lecturas_deduplicadas'] += 1
+                    valor = copy.deepcopy(unidad.lecturas[clave][0])
+                    return superponer(unidad, valor, *args, **kwargs) if superponer else valor
+            
+            encontrado, valor = self.cache.obtener(clave)
+            if not encontrado:
+                self._hilo.error_lectura = False
+                generaciones = self.cache.generaciones(tablas)
+                valor = metodo(self, *args, **kwargs)
+                # Los resultados de una lectura fallida no se guardan
+                if self._hilo.error_lectura:
+                    return valor
+                # Tampoco los que una escritura concurrente dejó obsoletos
+                self.cache.guardar(clave, valor, ttl, tablas, generaciones)
+            
+            if unidad is not None:
+                unidad.lecturas[clave] = (valor, frozenset(tablas))
+                if identidades is not None:
+                    unidad.mapa_identidad.update(identidades(valor))
+            # Se entrega una copia para que el llamador no altere la caché
+            valor = copy.deepcopy(valor)
+            if unidad is not None and superponer is not None:
+                valor = superponer(unidad, valor, *args, **kwargs)
+            return valor
+        return envoltura
+    return decorador
+
+def _invalida(*tablas):
+    """Invalida las lecturas cacheadas que dependen de las tablas que escribe el método"""
+    def decorador(metodo):
+        @functools.wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            try:
+                return metodo(self, *args, **kwargs)
+            finally:
+                self.cache.invalidar_tablas(tablas)
+                unidad = self.unidad_actual()
+                if unidad is not None:
+                    unidad.invalidar(tablas)
+        return envoltura
+    return decorador
+
+def _identidades_sesiones(df_sesiones):
+    """Filas completas de sesiones para el mapa de identidad, por ID"""
+    return [(('sesiones', fila['id']), fila) for fila in df_sesiones.to_dict('records')]
+
+def _superponer_puntajes(unidad, df_puntajes, sesion_id):
+    """Aplica a los puntajes leídos de una sesión los que la unidad aún no envió"""
+    pendientes = unidad.escrituras.get(int(sesion_id))
+    if not pendientes or 'Puntaje' not in df_puntajes.columns:
+        return df_puntajes
+    
+    posiciones = {
+        clave_alumno(apellido, nombre): i
+        for i, (apellido, nombre) in enumerate(zip(df_puntajes['Apellido'], df_puntajes['Nombre']))
+    }
+    columna = df_puntajes.columns.get_loc('Puntaje')
+    nuevas = []
+    for clave, fila in pendientes.items():
+        if clave in posiciones:
+            df_puntajes.iat[posiciones[clave], columna] = fila['Puntaje']
+        else:
+            nuevas.append(fila)
+    if nuevas:
+        df_puntajes = pd.concat([df_puntajes, pd.DataFrame(nuevas)], ignore_index=True)
+    return df_puntajes
+
+class ColaPuntajes:
+    """
+    Escritura diferida de clics de puntaje
+    Agrupa los deltas netos por (sesion_id, alumno_id) y los envía en un solo lote
+    """
+
+    def __init__(self, enviar, intervalo: float = INTERVALO_ESCRITURA):
+        # enviar recibe la lista de cambios y los aplica en el servidor
+        self._enviar = enviar
+        self.intervalo = intervalo
+        self._deltas = {}
+        self._hoja = {}
+        self._lock = threading.Lock()
+        self._temporizador = None
+        self._reintentos = 0
+        self.ultimo_vaciado = None
+        self.ultima_actividad = time.monotonic()
+        self.fallos = deque(maxlen=20)
+
+    def registrar(self, sesion_id, alumno_id, delta, puntaje_actual, puntaje_maximo) -> int:
+        """Aplica el clic en la hoja local y lo encola; retorna el puntaje mostrado"""
+        clave = (int(sesion_id), int(alumno_id))
+        with self._lock:
+            self.ultima_actividad = time.monotonic()
+            base = self._hoja.get(clave, int(puntaje_actual))
+            nuevo = max(0, min(int(puntaje_maximo), base + int(delta)))
+            
+            # Se encola el delta efectivo para que el servidor llegue al mismo valor
+            self._deltas[clave] = self._deltas.get(clave, 0) + (nuevo - base)
+            self._hoja[clave] = nuevo
+            
+            if self._temporizador is None:
+                self._programar(self.intervalo)
+        return nuevo
+
+    def _programar(self, espera):
+        # Se llama con self._lock tomado
+        self._temporizador = threading.Timer(espera, self.vaciar)
+        self._temporizador.daemon = True
+        self._temporizador.start()
+
+    def puntaje_local(self, sesion_id, alumno_id):
+        """Puntaje aún no confirmado por el servidor, o None"""
+        with self._lock:
+            return self._hoja.get((int(sesion_id), int(alumno_id)))
+
+    def tiene_hoja(self) -> bool:
+        with self._lock:
+            return bool(self._hoja)
+
+    def inactiva(self, segundos: float) -> bool:
+        """Sin cambios pendientes ni puntajes sin confirmar y sin clics en los últimos segundos"""
+        with self._lock:
+            return (not self._hoja and not self._deltas
+                    and time.monotonic() - self.ultima_actividad > segundos)
+
+    def pendientes(self) -> int:
+        with self._lock:
+            return sum(1 for delta in self._deltas.values() if delta)
+
+    def vaciar(self) -> int:
+        """Envía los deltas acumulados; retorna la cantidad de cambios enviados"""
+        with self._lock:
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+                self._temporizador = None
+            claves = list(self._deltas)
+            cambios = [
+                {'sesion_id': sesion_id, 'alumno_id': alumno_id, 'delta': delta}
+                for (sesion_id, alumno_id), delta in self._deltas.items() if delta
+            ]
+            self._deltas = {}
+        
+        if cambios:
+            try:
+                self._enviar(cambios)
+            except Exception as e:
+                # Devolver los cambios a la cola y reintentar con espera creciente
+                with self._lock:
+                    for cambio in cambios:
+                        clave = (cambio['sesion_id'], cambio['alumno_id'])
+                        self._deltas[clave] = self._deltas.get(clave, 0) + cambio['delta']
+                    self.fallos.append({
+                        'Fecha': datetime.now().strftime('%H:%M:%S'),
+                        'Cambios': len(cambios),
+                        'Error': str(e)
+                    })
+                    self._reintentos += 1
+                    if self._temporizador is None:
+                        self._programar(min(ESPERA_MAXIMA_REINTENTO, self.intervalo * 2 ** self._reintentos))
+                return 0
+        
+        with self._lock:
+            # Lo confirmado sin clics posteriores vuelve a leerse desde la base de datos
+            for clave in claves:
+                if clave not in self._deltas:
+                    self._hoja.pop(clave, None)
+            if cambios:
+                self.ultimo_vaciado = datetime.now()
+                # Los fallos anteriores quedaron cubiertos por este envío
+                self._reintentos = 0
+                self.fallos.clear()
+        return len(cambios)
+
+# Clientes cuyas tablas ya se verificaron (una vez por cliente, no por proceso)
+_clientes_verificados = weakref.WeakSet()
+_lock_verificacion = threading.Lock()
+
+def crear_cliente():
+    """
+    Crea el cliente de datos según st.secrets["backend"]:
+    "supabase" (por defecto), "sqlite" (archivo local en st.secrets["sqlite_ruta"])
+    o "simulado" (en memoria con latencia de red st.secrets["latencia"] en segundos)
+    """
+    backend = st.secrets.get("backend", "supabase")
+    if backend == "sqlite":
+        return ClienteSQLite(st.secrets.get("sqlite_ruta", RUTA_SQLITE))
+    if backend == "simulado":
+        return ClienteSimulado(st.secrets.get("latencia", LATENCIA_WAN))
+    if backend != "supabase":
+        raise ValueError(f"Backend desconocido: {backend}")
+    return create_client(st.secrets["supabase_url"], st.secrets["supabase_key"])
+
+class SupabaseManager:
+    def __init__(self, client=None):
+        # Cualquier cliente con la interfaz table(...)/rpc(...) de Supabase
+        self.client = client if client is not None else crear_cliente()
+        self.cache = CacheConsultas()
+        # Caché de identidad código → ID de curso
+        self._cache_cursos = CacheTTL(TTL_CURSOS)
+        # Padrones por curso: curso_id → {(apellido, nombre) normalizados: alumno_id}
+        self._cache_padrones = CacheTTL(TTL_PADRONES)
+        # Curso al que pertenece cada sesión: sesion_id → curso_id
+        self._cache_sesiones = CacheTTL(TTL_CURSOS)
+        self._hilo = threading.local()
+        # Una cola de escritura diferida por sesión del navegador
+        self._colas_puntajes = {}
+        self._lock_colas = threading.Lock()
         self._verificar_tablas()
 
+    @_invalida('cursos')
     def _verificar_tablas(self):
-        """Verifica y crea las tablas necesarias si no existen"""
+        """
+        Verifica y crea las tablas necesarias si no existen (una vez por cliente)
+        Si la verificación falla se vuelve a intentar con el siguiente manager del mismo cliente
+        """
+        with _lock_verificacion:
+            if self.client in _clientes_verificados:
+                return
+            try:
+                # Basta con saber si existe al menos un curso
+                response = self.client.table('cursos').select('id').limit(1).execute()
+                if not response.data:
+                    self.client.table('cursos').insert({
+                        'nombre': 'Curso de Ejemplo',
+                        'codigo': 'CURSO101'
+                    }).execute()
+                _clientes_verificados.add(self.client)
+            except Exception as e:
+                st.error(f"Error al verificar tablas: {str(e)}")
+
+    @contextmanager
+    def unidad_de_trabajo(self):
+        """
+        Abre una unidad de trabajo para el hilo actual (una por rerun)
+        Al cerrarse envía en lote las escrituras de puntajes acumuladas
+        """
+        unidad = self.unidad_actual()
+        if unidad is not None:
+            # Ya hay una unidad abierta: se reutiliza
+            yield unidad
+            return
+        
+        unidad = UnidadDeTrabajo()
+        self._hilo.unidad = unidad
         try:
-            response = self.client.table('cursos').select('*').execute()
-            if not response.data:
-                self.client.table('cursos').insert({
-                    'nombre': 'Curso de Ejemplo',
-                    'codigo': 'CURSO101'
-                }).execute()
-        except Exception as e:
-            st.error(f"Error al verificar tablas: {str(e)}")
+            yield unidad
+        finally:
+            self._hilo.unidad = None
+            self._confirmar_unidad(unidad)
+
+    def unidad_actual(self):
+        """Unidad de trabajo abierta en el hilo actual, o None"""
+        return getattr(self._hilo, 'unidad', None)
+
+    def _confirmar_unidad(self, unidad, avisar=True):
+        """
+        Envía las escrituras agrupadas de la unidad, un lote por sesión
+        Retorna las filas que no se pudieron guardar; con avisar=True además las muestra
+        """
+        todos = []
+        for sesion_id, filas in unidad.escrituras.items():
+            fallos = self.guardar_puntajes_lote(sesion_id, pd.DataFrame(list(filas.values())))
+            unidad.estadisticas['lotes_enviados'] += 1
+            if avisar:
+                self._avisar_fallos_puntajes(fallos)
+            todos.extend(fallos)
+        unidad.escrituras = {}
+        return todos
+
+    def confirmar_escrituras(self):
+        """Envía ya las escrituras agrupadas de la unidad abierta; retorna las filas que fallaron"""
+        unidad = self.unidad_actual()
+        return self._confirmar_unidad(unidad, avisar=False) if unidad is not None else []
+
+    def _error_lectura(self, mensaje):
+        """Muestra un error de lectura y evita que su resultado quede en caché"""
+        self._hilo.error_lectura = True
+        st.error(mensaje)
 
+    def _obtener_curso_id(self, codigo_curso):
+        """Resuelve el ID de un curso a partir de su código, usando la caché"""
+        codigo = codigo_curso.strip()
+        curso_id = self._cache_cursos.obtener(codigo)
+        if curso_id is not None:
+            return curso_id
+        
+        curso = self.client.table('cursos')\
+            .select('id')\
+            .eq('codigo', codigo)\
+            .limit(1)\
+            .execute()
+        
+        if not curso.data:
+            return None
+        
+        curso_id = curso.data[0]['id']
+        self._cache_cursos.guardar(codigo, curso_id)
+        return curso_id
+
+    def _obtener_curso_de_sesion(self, sesion_id):
+        """Resuelve el ID del curso al que pertenece una sesión"""
+        curso_id = self._cache_sesiones.obtener(sesion_id)
+        if curso_id is not None:
+            return curso_id
+        
+        sesion = self.client.table('sesiones')\
+            .select('curso_id')\
+            .eq('id', sesion_id)\
+            .limit(1)\
+            .execute()
+        
+        if not sesion.data:
+            return None
+        
+        curso_id = sesion.data[0]['curso_id']
+        self._cache_sesiones.guardar(sesion_id, curso_id)
+        return curso_id
+
+    def _obtener_indice_alumnos(self, curso_id):
+        """
+        Retorna el padrón del curso indexado por nombre normalizado
+        Se carga con una sola consulta y se reutiliza hasta que expire
+        """
+        indice = self._cache_padrones.obtener(curso_id)
+        if indice is None:
+            filas = self._leer_todo(lambda: self.client.table('alumnos')
+                .select('id, apellido, nombre')
+                .eq('curso_id', curso_id)
+                .order('id'))
+            indice = {clave_alumno(f['apellido'], f['nombre']): f['id'] for f in filas}
+            self._cache_padrones.guardar(curso_id, indice)
+        return indice
+
+    def _obtener_alumno_id(self, curso_id, apellido, nombre):
+        """Busca el ID de un alumno en el padrón en memoria del curso"""
+        if curso_id is None:
+            return None
+        return self._obtener_indice_alumnos(curso_id).get(clave_alumno(apellido, nombre))
+
+    @_invalida('sesiones')
     def crear_sesion(self, codigo_curso: str, nombre: str, puntaje_maximo: int, fecha) -> int:
         """
         Crea una nueva sesión
@@ -29,25 +560,22 @@ class SupabaseManager:
         """
         try:
             # Obtener ID del curso
-            curso = self.client.table('cursos')\
-                .select('id')\
-                .eq('codigo', codigo_curso)\
-                .single()\
-                .execute()
+            curso_id = self._obtener_curso_id(codigo_curso)
             
-            if not curso.data:
+            if curso_id is None:
                 st.error(f"No se encontró el curso con código {codigo_curso}")
                 return None
             
             # Crear la sesión
             response = self.client.table('sesiones').insert({
-                'curso_id': curso.data['id'],
+                'curso_id': curso_id,
                 'nombre': nombre,
                 'puntaje_maximo': puntaje_maximo,
                 'fecha': fecha.strftime('%Y-%m-%d')
             }).execute()
             
             if response.data:
+                self._cache_sesiones.guardar(response.data[0]['id'], curso_id)
                 return response.data[0]['id']
             return None
             
@@ -58,77 +586,182 @@ class SupabaseManager:
     def actualizar_puntaje_en_sesion(self, sesion_id: int, apellido: str, nombre: str, puntaje: int) -> bool:
         """
         Actualiza el puntaje de un alumno en una sesión específica
+        Dentro de una unidad de trabajo la escritura se agrupa y se envía al cerrarla
+        Retorna False si el alumno no pertenece al curso de la sesión
         """
         try:
-            # Obtener ID del alumno
-            alumno = self.client.table('alumnos')\
-                .select('id')\
-                .eq('apellido', apellido)\
-                .eq('nombre', nombre)\
-                .single()\
-                .execute()
+            # Obtener ID del alumno desde el padrón del curso de la sesión
+            alumno_id = self._obtener_alumno_id(
+                self._obtener_curso_de_sesion(sesion_id), apellido, nombre
+            )
             
-            if not alumno.data:
+            if alumno_id is None:
                 return False
-                
-            # Verificar si ya existe un puntaje para este alumno en esta sesión
-            puntaje_existente = self.client.table('puntajes')\
-                .select('id')\
-                .eq('sesion_id', sesion_id)\
-                .eq('alumno_id', alumno.data['id'])\
-                .execute()
-                
-            if puntaje_existente.data:
-                # Actualizar puntaje existente
-                self.client.table('puntajes')\
-                    .update({'puntaje': puntaje})\
-                    .eq('id', puntaje_existente.data[0]['id'])\
-                    .execute()
-            else:
-                # Crear nuevo puntaje
-                self.client.table('puntajes').insert({
-                    'sesion_id': sesion_id,
-                    'alumno_id': alumno.data['id'],
-                    'puntaje': puntaje
-                }).execute()
-                
+            
+            unidad = self.unidad_actual()
+            if unidad is not None:
+                unidad.escrituras.setdefault(int(sesion_id), {})[clave_alumno(apellido, nombre)] = {
+                    'Apellido': apellido,
+                    'Nombre': nombre,
+                    'Puntaje': puntaje
+                }
+                unidad.estadisticas['escrituras_agrupadas'] += 1
+                return True
+            
+            self._escribir_puntaje(sesion_id, alumno_id, puntaje)
             return True
             
         except Exception as e:
             print(f"Error al actualizar puntaje: {str(e)}")
             return False
 
+    @_invalida('puntajes')
+    def _escribir_puntaje(self, sesion_id, alumno_id, puntaje):
+        """Escribe de inmediato el puntaje de un alumno ya resuelto"""
+        # Verificar si ya existe un puntaje para este alumno en esta sesión
+        puntaje_existente = self.client.table('puntajes')\
+            .select('id')\
+            .eq('sesion_id', sesion_id)\
+            .eq('alumno_id', alumno_id)\
+            .execute()
+            
+        if puntaje_existente.data:
+            # Actualizar puntaje existente
+            self.client.table('puntajes')\
+                .update({'puntaje': puntaje})\
+                .eq('id', puntaje_existente.data[0]['id'])\
+                .execute()
+        else:
+            # Crear nuevo puntaje
+            self.client.table('puntajes').insert({
+                'sesion_id': sesion_id,
+                'alumno_id': alumno_id,
+                'puntaje': puntaje
+            }).execute()
+
+    @_invalida('puntajes')
+    def incrementar_puntaje(self, sesion_id: int, apellido: str, nombre: str, delta: int):
+        """
+        Suma delta al puntaje de un alumno de forma atómica en el servidor
+        El resultado se acota a [0, puntaje_maximo]; retorna el nuevo puntaje o None si hay error
+        """
+        try:
+            alumno_id = self._obtener_alumno_id(
+                self._obtener_curso_de_sesion(sesion_id), apellido, nombre
+            )
+            
+            if alumno_id is None:
+                return None
+            
+            # Función definida en src/config/sql/funciones.sql
+            response = self.client.rpc('incrementar_puntaje', {
+                'p_sesion_id': int(sesion_id),
+                'p_alumno_id': alumno_id,
+                'p_delta': int(delta)
+            }).execute()
+            
+            return response.data
+            
+        except Exception as e:
+            st.error(f"Error al incrementar puntaje: {str(e)}")
+            return None
+
+    @_invalida('puntajes')
+    def _enviar_lote_puntajes(self, cambios):
+        """Aplica un lote de deltas con una sola llamada a incrementar_puntajes_lote"""
+        response = self.client.rpc('incrementar_puntajes_lote', {'p_cambios': cambios}).execute()
+        return {(fila['sesion_id'], fila['alumno_id']): fila['puntaje'] for fila in response.data}
+
+    def _cola_puntajes(self, crear=False):
+        """
+        Cola de escritura diferida de la sesión del navegador actual, o None si no tiene
+        Al crear una, se descartan las de otras sesiones vacías e inactivas
+        """
+        if crear:
+            id_cola = st.session_state.setdefault(CLAVE_COLA_PUNTAJES, uuid.uuid4().hex)
+        else:
+            id_cola = st.session_state.get(CLAVE_COLA_PUNTAJES)
+        
+        with self._lock_colas:
+            cola = self._colas_puntajes.get(id_cola)
+            if cola is None and crear:
+                self._colas_puntajes = {
+                    clave: otra for clave, otra in self._colas_puntajes.items() if not otra.inactiva(TTL_COLAS_INACTIVAS)
+                }
+                cola = self._colas_puntajes[id_cola] = ColaPuntajes(self._enviar_lote_puntajes)
+            return cola
+
+    def vaciar_escritura_diferida(self) -> int:
+        """Envía ahora los clics pendientes de esta sesión; retorna la cantidad de cambios enviados"""
+        cola = self._cola_puntajes()
+        return cola.vaciar() if cola is not None else 0
+
+    def estado_escritura_diferida(self):
+        """Retorna los pendientes, la hora del último vaciado y los fallos recientes de esta sesión"""
+        cola = self._cola_puntajes()
+        if cola is None:
+            return {'pendientes': 0, 'ultimo_vaciado': None, 'fallos': []}
+        return {
+            'pendientes': cola.pendientes(),
+            'ultimo_vaciado': cola.ultimo_vaciado,
+            'fallos': list(cola.fallos)
+        }
+
+    def registrar_clic_puntaje(self, sesion_id, apellido, nombre, delta, puntaje_actual, puntaje_maximo, diferido=False):
+        """
+        Registra un clic ➕/➖ de puntaje
+        Con diferido=True actualiza la hoja local y encola el cambio en la cola de esta sesión;
+        si no, escribe de inmediato. Retorna el puntaje a mostrar o None si hay error
+        """
+        if not diferido:
+            return self.incrementar_puntaje(sesion_id, apellido, nombre, delta)
+        
+        alumno_id = self._obtener_alumno_id(
+            self._obtener_curso_de_sesion(sesion_id), apellido, nombre
+        )
+        if alumno_id is None:
+            return None
+        return self._cola_puntajes(crear=True).registrar(sesion_id, alumno_id, delta, puntaje_actual, puntaje_maximo)
+
+    def aplicar_puntajes_pendientes(self, sesion_id, df_puntajes):
+        """Superpone a df_puntajes los puntajes de la hoja local de esta sesión aún no confirmados"""
+        cola = self._cola_puntajes()
+        if df_puntajes.empty or cola is None or not cola.tiene_hoja():
+            return df_puntajes
+        
+        curso_id = self._obtener_curso_de_sesion(sesion_id)
+        df_puntajes = df_puntajes.copy()
+        for idx, apellido, nombre in zip(df_puntajes.index, df_puntajes['Apellido'], df_puntajes['Nombre']):
+            alumno_id = self._obtener_alumno_id(curso_id, apellido, nombre)
+            if alumno_id is None:
+                continue
+            puntaje = cola.puntaje_local(sesion_id, alumno_id)
+            if puntaje is not None:
+                df_puntajes.at[idx, 'Puntaje'] = puntaje
+        return df_puntajes
+
+    @_invalida('sesiones', 'puntajes')
     def actualizar_puntaje_alumno(self, codigo_curso: str, alumno_apellido: str, alumno_nombre: str, puntaje: int) -> bool:
         """
         Actualiza el puntaje de un alumno en la sesión actual
         """
         try:
             # Obtener ID del curso
-            curso = self.client.table('cursos')\
-                .select('id')\
-                .eq('codigo', codigo_curso)\
-                .single()\
-                .execute()
+            curso_id = self._obtener_curso_id(codigo_curso)
             
-            if not curso.data:
+            if curso_id is None:
                 return False
             
             # Obtener ID del alumno
-            alumno = self.client.table('alumnos')\
-                .select('id')\
-                .eq('curso_id', curso.data['id'])\
-                .eq('apellido', alumno_apellido)\
-                .eq('nombre', alumno_nombre)\
-                .single()\
-                .execute()
+            alumno_id = self._obtener_alumno_id(curso_id, alumno_apellido, alumno_nombre)
             
-            if not alumno.data:
+            if alumno_id is None:
                 return False
             
             # Verificar si existe una sesión actual
             sesion_actual = self.client.table('sesiones')\
                 .select('id')\
-                .eq('curso_id', curso.data['id'])\
+                .eq('curso_id', curso_id)\
                 .eq('fecha', datetime.now().strftime('%Y-%m-%d'))\
                 .single()\
                 .execute()
@@ -136,7 +769,7 @@ class SupabaseManager:
             # Si no existe sesión actual, crearla
             if not sesion_actual.data:
                 sesion = self.client.table('sesiones').insert({
-                    'curso_id': curso.data['id'],
+                    'curso_id': curso_id,
                     'nombre': f'Sesión {datetime.now().strftime("%Y-%m-%d")}',
                     'fecha': datetime.now().strftime('%Y-%m-%d'),
                     'puntaje_maximo': 20  # Valor por defecto
@@ -149,7 +782,7 @@ class SupabaseManager:
             puntaje_existente = self.client.table('puntajes')\
                 .select('id')\
                 .eq('sesion_id', sesion_id)\
-                .eq('alumno_id', alumno.data['id'])\
+                .eq('alumno_id', alumno_id)\
                 .single()\
                 .execute()
             
@@ -163,7 +796,7 @@ class SupabaseManager:
                 # Crear nuevo puntaje
                 self.client.table('puntajes').insert({
                     'sesion_id': sesion_id,
-                    'alumno_id': alumno.data['id'],
+                    'alumno_id': alumno_id,
                     'puntaje': puntaje
                 }).execute()
             
@@ -173,30 +806,24 @@ class SupabaseManager:
             print(f"Error al actualizar puntaje: {str(e)}")
             return False
 
-    def _verificar_tablas(self):
-        """Verifica y crea las tablas necesarias si no existen"""
-        try:
-            response = self.client.table('cursos').select('*').execute()
-            if not response.data:
-                self.client.table('cursos').insert({
-                    'nombre': 'Curso de Ejemplo',
-                    'codigo': 'CURSO101'
-                }).execute()
-        except Exception as e:
-            st.error(f"Error al verificar tablas: {str(e)}")
-
+    @_lectura_cacheada(TTL_LECTURA, 'cursos')
     def obtener_lista_cursos(self):
         """Obtiene la lista de cursos disponibles"""
         try:
-            response = self.client.table('cursos').select('codigo, nombre').execute()
+            response = self.client.table('cursos').select('id, codigo, nombre').execute()
             if not response.data:
                 return [], []
             df = pd.DataFrame(response.data)
+            
+            # Precargar la caché de códigos con los IDs obtenidos
+            for curso in response.data:
+                self._cache_cursos.guardar(curso['codigo'].strip(), curso['id'])
             return df['codigo'].tolist(), df['nombre'].tolist()
         except Exception as e:
-            st.error(f"Error al obtener lista de cursos: {str(e)}")
+            self._error_lectura(f"Error al obtener lista de cursos: {str(e)}")
             return [], []
 
+    @_invalida('cursos')
     def crear_curso(self, nombre, codigo):
         """Crea un nuevo curso"""
         try:
@@ -222,30 +849,28 @@ class SupabaseManager:
                 st.error("No se pudo crear el curso. Respuesta vacía del servidor.")
                 return False
             
+            self._cache_cursos.invalidar(codigo.strip())
             return True
             
         except Exception as e:
             st.error(f"Error al crear curso: {str(e)}")
             return False
 
+    @_lectura_cacheada(TTL_LECTURA, 'alumnos')
     def leer_alumnos_curso(self, codigo_curso):
         """Lee la lista de alumnos de un curso específico"""
         try:
             # Primero obtener el ID del curso
-            curso = self.client.table('cursos')\
-                .select('id')\
-                .eq('codigo', codigo_curso)\
-                .single()\
-                .execute()
+            curso_id = self._obtener_curso_id(codigo_curso)
             
-            if not curso.data:
+            if curso_id is None:
                 st.error(f"No se encontró el curso con código {codigo_curso}")
                 return pd.DataFrame(columns=['Apellido', 'Nombre', 'Puntaje'])
             
             # Obtener los alumnos del curso
             response = self.client.table('alumnos')\
                 .select('apellido, nombre')\
-                .eq('curso_id', curso.data['id'])\
+                .eq('curso_id', curso_id)\
                 .order('apellido')\
                 .execute()
             
@@ -260,39 +885,32 @@ class SupabaseManager:
             return df
             
         except Exception as e:
-            st.error(f"Error al leer alumnos del curso: {str(e)}")
+            self._error_lectura(f"Error al leer alumnos del curso: {str(e)}")
             return pd.DataFrame(columns=['Apellido', 'Nombre', 'Puntaje'])
 
+    @_invalida('alumnos')
     def agregar_alumno(self, codigo_curso, apellido, nombre):
         """Agrega un nuevo alumno al curso"""
         try:
             # Obtener ID del curso
-            curso = self.client.table('cursos')\
-                .select('id')\
-                .eq('codigo', codigo_curso.strip())\
-                .single()\
-                .execute()
+            curso_id = self._obtener_curso_id(codigo_curso)
             
-            if not curso.data:
+            if curso_id is None:
                 st.error(f"No se encontró el curso con código {codigo_curso}")
                 return False
             
             # Verificar si el alumno ya existe
-            alumno_existente = self.client.table('alumnos')\
-                .select('id')\
-                .eq('curso_id', curso.data['id'])\
-                .eq('apellido', apellido.strip())\
-                .eq('nombre', nombre.strip())\
-                .execute()
+            indice = self._obtener_indice_alumnos(curso_id)
+            clave = clave_alumno(apellido, nombre)
             
-            if alumno_existente.data:
+            if clave in indice:
                 st.warning(f"El alumno {apellido}, {nombre} ya existe en este curso")
                 return False
             
             # Insertar nuevo alumno
             response = self.client.table('alumnos')\
                 .insert({
-                    'curso_id': curso.data['id'],
+                    'curso_id': curso_id,
                     'apellido': apellido.strip(),
                     'nombre': nombre.strip()
                 })\
@@ -302,52 +920,185 @@ class SupabaseManager:
                 st.error(f"No se pudo agregar al alumno {apellido}, {nombre}")
                 return False
             
+            # Actualizar el padrón en memoria
+            indice[clave] = response.data[0]['id']
             return True
             
         except Exception as e:
             st.error(f"Error al agregar alumno: {str(e)}")
             return False
 
-    def guardar_sesion(self, codigo_curso, nombre_sesion, puntaje_maximo, fecha, df_alumnos):
+    @_invalida('alumnos')
+    def importar_alumnos_lote(self, codigo_curso, df_alumnos, al_avanzar=None):
+        """
+        Agrega alumnos en bloque a un curso
+        Descarta en memoria los que ya existen o se repiten, inserta el resto en lotes
+        de TAMANO_LOTE y llama a al_avanzar(procesados, total) después de cada lote
+        Retorna una lista con el resultado de cada fila o None si el curso no existe
+        """
+        curso_id = self._obtener_curso_id(codigo_curso)
+        if curso_id is None:
+            st.error(f"No se encontró el curso con código {codigo_curso}")
+            return None
+        
+        indice = self._obtener_indice_alumnos(curso_id)
+        resultados = []
+        nuevos = {}
+        for apellido, nombre in zip(df_alumnos['Apellido'], df_alumnos['Nombre']):
+            if pd.isna(apellido) or pd.isna(nombre) or not str(apellido).strip() or not str(nombre).strip():
+                resultados.append({'Apellido': apellido, 'Nombre': nombre, 'Estado': 'Error', 'Detalle': 'Datos vacíos'})
+                continue
+            
+            apellido, nombre = str(apellido).strip(), str(nombre).strip()
+            clave = clave_alumno(apellido, nombre)
+            resultado = {'Apellido': apellido, 'Nombre': nombre, 'Estado': 'Pendiente', 'Detalle': ''}
+            if clave in indice:
+                resultado.update(Estado='Duplicado', Detalle='Ya existe en el curso')
+            elif clave in nuevos:
+                resultado.update(Estado='Duplicado', Detalle='Repetido en la lista')
+            else:
+                nuevos[clave] = resultado
+            resultados.append(resultado)
+        
+        pendientes = list(nuevos.items())
+        for inicio in range(0, len(pendientes), TAMANO_LOTE):
+            lote = pendientes[inicio:inicio + TAMANO_LOTE]
+            filas = [
+                {'curso_id': curso_id, 'apellido': r['Apellido'], 'nombre': r['Nombre']}
+                for _, r in lote
+            ]
+            try:
+                insertados = self.client.table('alumnos').insert(filas).execute().data
+            except Exception:
+                # Reintentar fila por fila para aislar las que fallan
+                insertados = []
+                for fila, (_, resultado) in zip(filas, lote):
+                    try:
+                        insertados.extend(self.client.table('alumnos').insert(fila).execute().data)
+                    except Exception as e:
+                        resultado.update(Estado='Error', Detalle=str(e))
+            
+            # Registrar los IDs nuevos en el padrón en memoria
+            for fila in insertados:
+                clave = clave_alumno(fila['apellido'], fila['nombre'])
+                indice[clave] = fila['id']
+                nuevos[clave].update(Estado='Agregado')
+            
+            if al_avanzar is not None:
+                al_avanzar(min(inicio + TAMANO_LOTE, len(pendientes)), len(pendientes))
+        
+        for _, resultado in pendientes:
+            if resultado['Estado'] == 'Pendiente':
+                resultado.update(Estado='Error', Detalle='El servidor no confirmó la inserción')
+        
+        return resultados
+
+    @_invalida('puntajes')
+    def guardar_puntajes_lote(self, sesion_id, df_puntajes, curso_id=None):
+        """
+        Guarda los puntajes de una sesión con upserts masivos sobre (sesion_id, alumno_id)
+        Retorna la lista de filas que no se pudieron guardar, con el motivo
+        """
+        if curso_id is None:
+            curso_id = self._obtener_curso_de_sesion(sesion_id)
+        
+        fallos = []
+        filas = {}
+        nombres = {}
+        for apellido, nombre, puntaje in zip(df_puntajes['Apellido'], df_puntajes['Nombre'], df_puntajes['Puntaje']):
+            alumno_id = self._obtener_alumno_id(curso_id, apellido, nombre)
+            if alumno_id is None:
+                fallos.append({'Apellido': apellido, 'Nombre': nombre, 'Error': 'Alumno no encontrado en el curso'})
+                continue
+            if pd.isna(puntaje):
+                fallos.append({'Apellido': apellido, 'Nombre': nombre, 'Error': 'Puntaje vacío'})
+                continue
+            
+            # Un mismo alumno solo puede aparecer una vez por upsert
+            filas[alumno_id] = {'sesion_id': int(sesion_id), 'alumno_id': alumno_id, 'puntaje': int(puntaje)}
+            nombres[alumno_id] = (apellido, nombre)
+        
+        filas = list(filas.values())
+        for inicio in range(0, len(filas), TAMANO_LOTE):
+            lote = filas[inicio:inicio + TAMANO_LOTE]
+            try:
+                self.client.table('puntajes')\
+                    .upsert(lote, on_conflict='sesion_id,alumno_id')\
+                    .execute()
+            except Exception:
+                # Reintentar fila por fila para aislar las que fallan
+                for fila in lote:
+                    try:
+                        self.client.table('puntajes')\
+                            .upsert(fila, on_conflict='sesion_id,alumno_id')\
+                            .execute()
+                    except Exception as e:
+                        apellido, nombre = nombres[fila['alumno_id']]
+                        fallos.append({'Apellido': apellido, 'Nombre': nombre, 'Error': str(e)})
+        
+        return fallos
+
+    def registrar_puntajes_sesion(self, sesion_id, df_puntajes):
+        """
+        Registra puntajes editados de una sesión
+        Dentro de una unidad de trabajo se agrupan y se envían en un solo lote al cerrarla;
+        si no, se guardan de inmediato. Retorna las filas rechazadas, con el motivo
+        """
+        if self.unidad_actual() is None:
+            return self.guardar_puntajes_lote(sesion_id, df_puntajes)
+        
+        fallos = []
+        for apellido, nombre, puntaje in zip(df_puntajes['Apellido'], df_puntajes['Nombre'], df_puntajes['Puntaje']):
+            if pd.isna(puntaje):
+                fallos.append({'Apellido': apellido, 'Nombre': nombre, 'Error': 'Puntaje vacío'})
+            elif not self.actualizar_puntaje_en_sesion(sesion_id, apellido, nombre, int(puntaje)):
+                fallos.append({'Apellido': apellido, 'Nombre': nombre, 'Error': 'Alumno no encontrado en el curso'})
+        return fallos
+
+    def _avisar_fallos_puntajes(self, fallos):
+        """Muestra un resumen de los puntajes que no se pudieron guardar"""
+        if fallos:
+            st.warning(f"No se pudieron guardar {len(fallos)} puntajes")
+            st.dataframe(pd.DataFrame(fallos), hide_index=True)
+
+    @_invalida('sesiones', 'puntajes')
+    def guardar_sesion(self, codigo_curso, nombre_sesion, puntaje_maximo, fecha, df_alumnos, en_lote=True):
         """Guarda una nueva sesión con sus puntajes"""
         try:
             # Obtener ID del curso
-            curso = self.client.table('cursos')\
-                .select('id')\
-                .eq('codigo', codigo_curso)\
-                .single()\
-                .execute()
+            curso_id = self._obtener_curso_id(codigo_curso)
             
-            if not curso.data:
+            if curso_id is None:
                 st.error(f"No se encontró el curso con código {codigo_curso}")
                 return None
             
             # Crear la sesión
             sesion = self.client.table('sesiones').insert({
-                'curso_id': curso.data['id'],
+                'curso_id': curso_id,
                 'nombre': nombre_sesion,
                 'puntaje_maximo': puntaje_maximo,
                 'fecha': fecha.strftime('%Y-%m-%d')
             }).execute()
             
             sesion_id = sesion.data[0]['id']
+            self._cache_sesiones.guardar(sesion_id, curso_id)
+            
+            if en_lote:
+                self._avisar_fallos_puntajes(
+                    self.guardar_puntajes_lote(sesion_id, df_alumnos, curso_id)
+                )
+                return sesion_id
             
             # Guardar puntajes de cada alumno
             for _, row in df_alumnos.iterrows():
                 # Obtener ID del alumno
-                alumno = self.client.table('alumnos')\
-                    .select('id')\
-                    .eq('curso_id', curso.data['id'])\
-                    .eq('apellido', row['Apellido'])\
-                    .eq('nombre', row['Nombre'])\
-                    .single()\
-                    .execute()
+                alumno_id = self._obtener_alumno_id(curso_id, row['Apellido'], row['Nombre'])
                 
-                if alumno.data:
+                if alumno_id is not None:
                     # Guardar puntaje
                     self.client.table('puntajes').insert({
                         'sesion_id': sesion_id,
-                        'alumno_id': alumno.data['id'],
+                        'alumno_id': alumno_id,
                         'puntaje': row['Puntaje']
                     }).execute()
             
@@ -357,32 +1108,30 @@ class SupabaseManager:
             st.error(f"Error al guardar sesión: {str(e)}")
             return None
 
+    @_lectura_cacheada(TTL_LECTURA, 'sesiones', identidades=_identidades_sesiones)
     def obtener_sesiones_curso(self, codigo_curso):
         """Obtiene todas las sesiones de un curso"""
         try:
             # Obtener ID del curso
-            curso = self.client.table('cursos')\
-                .select('id')\
-                .eq('codigo', codigo_curso)\
-                .single()\
-                .execute()
+            curso_id = self._obtener_curso_id(codigo_curso)
             
-            if not curso.data:
+            if curso_id is None:
                 return pd.DataFrame()
             
-            # Obtener sesiones
+            # Filas completas: también alimentan el mapa de identidad de obtener_sesion
             response = self.client.table('sesiones')\
-                .select('id, nombre, puntaje_maximo, fecha')\
-                .eq('curso_id', curso.data['id'])\
+                .select('*')\
+                .eq('curso_id', curso_id)\
                 .order('fecha')\
                 .execute()
             
             return pd.DataFrame(response.data)
             
         except Exception as e:
-            st.error(f"Error al obtener sesiones: {str(e)}")
+            self._error_lectura(f"Error al obtener sesiones: {str(e)}")
             return pd.DataFrame()
 
+    @_lectura_cacheada(TTL_LECTURA_PUNTAJES, 'puntajes', 'alumnos', superponer=_superponer_puntajes)
     def obtener_puntajes_sesion(self, sesion_id):
         """Obtiene los puntajes de una sesión específica"""
         try:
@@ -406,27 +1155,30 @@ class SupabaseManager:
             return pd.DataFrame(data)
             
         except Exception as e:
-            st.error(f"Error al obtener puntajes: {str(e)}")
+            self._error_lectura(f"Error al obtener puntajes: {str(e)}")
             return pd.DataFrame(columns=['Apellido', 'Nombre', 'Puntaje'])
 
-    def actualizar_puntajes_sesion(self, sesion_id, df_puntajes):
+    @_invalida('puntajes')
+    def actualizar_puntajes_sesion(self, sesion_id, df_puntajes, en_lote=True):
         """Actualiza los puntajes de una sesión"""
         try:
+            curso_id = self._obtener_curso_de_sesion(sesion_id)
+            
+            if en_lote:
+                fallos = self.guardar_puntajes_lote(sesion_id, df_puntajes, curso_id)
+                self._avisar_fallos_puntajes(fallos)
+                return not fallos
+            
             for _, row in df_puntajes.iterrows():
                 # Obtener ID del alumno
-                alumno = self.client.table('alumnos')\
-                    .select('id')\
-                    .eq('apellido', row['Apellido'])\
-                    .eq('nombre', row['Nombre'])\
-                    .single()\
-                    .execute()
+                alumno_id = self._obtener_alumno_id(curso_id, row['Apellido'], row['Nombre'])
                 
-                if alumno.data:
+                if alumno_id is not None:
                     # Actualizar puntaje
                     self.client.table('puntajes')\
                         .update({'puntaje': row['Puntaje']})\
                         .eq('sesion_id', sesion_id)\
-                        .eq('alumno_id', alumno.data['id'])\
+                        .eq('alumno_id', alumno_id)\
                         .execute()
             
             return True
@@ -434,57 +1186,80 @@ class SupabaseManager:
         except Exception as e:
             st.error(f"Error al actualizar puntajes: {str(e)}")
             return False
-    def obtener_evaluaciones_curso(self, codigo_curso):
-        """Obtiene todas las evaluaciones de un curso"""
+    @_lectura_cacheada(TTL_LECTURA, 'evaluaciones', 'evaluaciones_sesiones', 'sesiones')
+    def obtener_evaluaciones_curso(self, codigo_curso, solo_encabezados=False):
+        """
+        Obtiene todas las evaluaciones de un curso con sus sesiones en una sola consulta
+        Con solo_encabezados=True omite las sesiones (ver obtener_sesiones_evaluacion)
+        """
         try:
             # Obtener ID del curso
-            curso = self.client.table('cursos')\
-                .select('id')\
-                .eq('codigo', codigo_curso)\
-                .single()\
-                .execute()
+            curso_id = self._obtener_curso_id(codigo_curso)
             
-            if not curso.data:
+            if curso_id is None:
                 return []
             
-            # Obtener evaluaciones
+            columnas = 'id, nombre, escala, fecha'
+            if not solo_encabezados:
+                columnas += ', evaluaciones_sesiones(sesiones(nombre, fecha, puntaje_maximo))'
+            
+            # Obtener evaluaciones junto con sus sesiones asociadas
             response = self.client.table('evaluaciones')\
-                .select('*')\
-                .eq('curso_id', curso.data['id'])\
+                .select(columnas)\
+                .eq('curso_id', curso_id)\
                 .order('fecha')\
                 .execute()
             
             evaluaciones = []
             for eval_data in response.data:
-                # Obtener sesiones asociadas
-                sesiones = self.client.table('evaluaciones_sesiones')\
-                    .select('sesiones(nombre, fecha, puntaje_maximo)')\
-                    .eq('evaluacion_id', eval_data['id'])\
-                    .execute()
-                
-                sesiones_info = [
-                    {
-                        'nombre': s['sesiones']['nombre'],
-                        'fecha': s['sesiones']['fecha'],
-                        'puntaje_maximo': s['sesiones']['puntaje_maximo']
-                    } for s in sesiones.data
-                ]
-                
-                evaluaciones.append({
+                evaluacion = {
                     'id': eval_data['id'],
                     'nombre': eval_data['nombre'],
                     'escala': eval_data['escala'],
-                    'fecha': eval_data['fecha'],
-                    'sesiones': sesiones_info
-                })
+                    'fecha': eval_data['fecha']
+                }
+                if not solo_encabezados:
+                    evaluacion['sesiones'] = self._extraer_sesiones(eval_data['evaluaciones_sesiones'])
+                evaluaciones.append(evaluacion)
             
             return evaluaciones
         except Exception as e:
-            st.error(f"Error al obtener evaluaciones: {str(e)}")
+            self._error_lectura(f"Error al obtener evaluaciones: {str(e)}")
+            return []
+
+    def _extraer_sesiones(self, relaciones):
+        """Convierte filas de evaluaciones_sesiones con sesiones anidadas en una lista simple"""
+        return [
+            {
+                'nombre': r['sesiones']['nombre'],
+                'fecha': r['sesiones']['fecha'],
+                'puntaje_maximo': r['sesiones']['puntaje_maximo']
+            } for r in relaciones if r.get('sesiones')
+        ]
+
+    @_lectura_cacheada(TTL_LECTURA, 'evaluaciones_sesiones', 'sesiones')
+    def obtener_sesiones_evaluacion(self, evaluacion_id):
+        """Obtiene las sesiones incluidas en una evaluación"""
+        try:
+            response = self.client.table('evaluaciones_sesiones')\
+                .select('sesiones(nombre, fecha, puntaje_maximo)')\
+                .eq('evaluacion_id', evaluacion_id)\
+                .execute()
+            
+            return self._extraer_sesiones(response.data)
+        except Exception as e:
+            self._error_lectura(f"Error al obtener sesiones de la evaluación: {str(e)}")
             return []
 
+    @_lectura_cacheada(TTL_LECTURA, 'sesiones')
     def obtener_sesion(self, sesion_id):
         """Obtiene los detalles de una sesión específica"""
+        # Si la sesión ya se leyó en esta ejecución se toma del mapa de identidad
+        unidad = self.unidad_actual()
+        if unidad is not None and ('sesiones', sesion_id) in unidad.mapa_identidad:
+            unidad.estadisticas['filas_del_mapa'] += 1
+            return dict(unidad.mapa_identidad[('sesiones', sesion_id)])
+        
         try:
             response = self.client.table('sesiones')\
                 .select('*')\
@@ -494,11 +1269,52 @@ class SupabaseManager:
             
             return response.data
         except Exception as e:
-            st.error(f"Error al obtener sesión: {str(e)}")
+            self._error_lectura(f"Error al obtener sesión: {str(e)}")
             return None
 
-    def obtener_resultados_evaluacion(self, evaluacion_id):
-        """Obtiene los resultados detallados de una evaluación"""
+    def _leer_todo(self, construir_consulta):
+        """
+        Lee todas las filas de una consulta paginando con range()
+        construir_consulta debe retornar una consulta nueva en cada llamada
+        """
+        filas = []
+        inicio = 0
+        while True:
+            response = construir_consulta()\
+                .range(inicio, inicio + TAMANO_PAGINA - 1)\
+                .execute()
+            filas.extend(response.data)
+            if len(response.data) < TAMANO_PAGINA:
+                return filas
+            inicio += TAMANO_PAGINA
+
+    def _leer_alumnos_y_puntajes(self, curso_id, df_sesiones):
+        """Lee en bloque los alumnos del curso y todos sus puntajes en las sesiones dadas"""
+        df_alumnos = pd.DataFrame(
+            self._leer_todo(lambda: self.client.table('alumnos')
+                .select('id, apellido, nombre')
+                .eq('curso_id', curso_id)
+                .order('id')),
+            columns=['id', 'apellido', 'nombre']
+        )
+        
+        puntajes = []
+        if not df_sesiones.empty:
+            sesiones_ids = [int(i) for i in df_sesiones['id']]
+            puntajes = self._leer_todo(lambda: self.client.table('puntajes')
+                .select('sesion_id, alumno_id, puntaje')
+                .in_('sesion_id', sesiones_ids)
+                .order('id'))
+        df_puntajes = pd.DataFrame(puntajes, columns=['sesion_id', 'alumno_id', 'puntaje'])
+        
+        return df_alumnos, df_puntajes
+
+    @_lectura_cacheada(TTL_LECTURA_PUNTAJES, 'evaluaciones', 'evaluaciones_sesiones', 'sesiones', 'alumnos', 'puntajes')
+    def obtener_detalle_evaluacion(self, evaluacion_id):
+        """
+        Obtiene los resultados de una evaluación junto con sus desgloses
+        por alumno y por sesión, usando un número constante de consultas
+        """
         try:
             # Obtener la evaluación
             evaluacion = self.client.table('evaluaciones')\
@@ -510,72 +1326,143 @@ class SupabaseManager:
             if not evaluacion.data:
                 return None
 
-            # Obtener las sesiones asociadas
+            # Obtener las sesiones asociadas con sus datos en una sola consulta
             sesiones = self.client.table('evaluaciones_sesiones')\
-                .select('sesion_id')\
+                .select('sesion_id, sesiones(id, nombre, fecha, puntaje_maximo)')\
                 .eq('evaluacion_id', evaluacion_id)\
                 .execute()
             
-            sesiones_ids = [s['sesion_id'] for s in sesiones.data]
+            df_sesiones = pd.DataFrame(
+                [s['sesiones'] for s in sesiones.data if s.get('sesiones')],
+                columns=['id', 'nombre', 'fecha', 'puntaje_maximo']
+            )
             
-            # Obtener los alumnos del curso
-            alumnos = self.client.table('alumnos')\
-                .select('id, apellido, nombre')\
-                .eq('curso_id', evaluacion.data['curso_id'])\
+            df_alumnos, df_puntajes = self._leer_alumnos_y_puntajes(
+                evaluacion.data['curso_id'], df_sesiones
+            )
+            
+            return calcular_resultados_evaluacion(
+                df_alumnos,
+                df_sesiones,
+                df_puntajes,
+                evaluacion.data['escala']
+            )
+            
+        except Exception as e:
+            self._error_lectura(f"Error al obtener resultados de evaluación: {str(e)}")
+            return None
+
+    @_lectura_cacheada(TTL_LECTURA_PUNTAJES, 'sesiones', 'alumnos', 'puntajes')
+    def previsualizar_evaluacion(self, codigo_curso, escala, sesiones_ids):
+        """
+        Calcula en memoria los resultados que tendría una evaluación, sin escribir nada
+        Retorna el mismo diccionario que obtener_detalle_evaluacion o None si hay error
+        """
+        try:
+            curso_id = self._obtener_curso_id(codigo_curso)
+            
+            if curso_id is None:
+                st.error(f"No se encontró el curso con código {codigo_curso}")
+                return None
+            
+            sesiones_ids = [int(i) for i in sesiones_ids]
+            response = self.client.table('sesiones')\
+                .select('id, nombre, fecha, puntaje_maximo')\
+                .eq('curso_id', curso_id)\
+                .in_('id', sesiones_ids)\
+                .order('fecha')\
                 .execute()
+            df_sesiones = pd.DataFrame(response.data, columns=['id', 'nombre', 'fecha', 'puntaje_maximo'])
             
-            resultados = []
-            for alumno in alumnos.data:
-                puntaje_total = 0
-                puntaje_maximo = 0
-                
-                # Calcular puntajes para cada sesión
-                for sesion_id in sesiones_ids:
-                    sesion = self.obtener_sesion(sesion_id)
-                    if sesion:
-                        puntaje_maximo += sesion['puntaje_maximo']
-                        
-                        # Obtener puntaje del alumno
-                        puntaje = self.client.table('puntajes')\
-                            .select('puntaje')\
-                            .eq('sesion_id', sesion_id)\
-                            .eq('alumno_id', alumno['id'])\
-                            .single()\
-                            .execute()
-                        
-                        if puntaje.data:
-                            puntaje_total += puntaje.data['puntaje']
-                
-                # Calcular nota final
-                porcentaje = (puntaje_total / puntaje_maximo * 100) if puntaje_maximo > 0 else 0
-                nota = round((porcentaje * evaluacion.data['escala']) / 100, 2)
-                
-                resultados.append({
-                    'Apellido': alumno['apellido'],
-                    'Nombre': alumno['nombre'],
-                    'Puntaje Total': puntaje_total,
-                    'Puntaje Máximo': puntaje_maximo,
-                    'Porcentaje': round(porcentaje, 2),
-                    'Nota': nota
-                })
+            df_alumnos, df_puntajes = self._leer_alumnos_y_puntajes(curso_id, df_sesiones)
+            
+            return calcular_resultados_evaluacion(df_alumnos, df_sesiones, df_puntajes, escala)
+            
+        except Exception as e:
+            self._error_lectura(f"Error al previsualizar evaluación: {str(e)}")
+            return None
+
+    @_lectura_cacheada(TTL_LECTURA_PUNTAJES, 'sesiones', 'alumnos', 'puntajes')
+    def obtener_libro_calificaciones(self, codigo_curso):
+        """
+        Obtiene el libro de calificaciones de un curso en bloque
+        Retorna un diccionario con 'alumnos', 'sesiones' y 'matriz' (alumnos×sesiones) o None
+        """
+        try:
+            curso_id = self._obtener_curso_id(codigo_curso)
+            
+            if curso_id is None:
+                st.error(f"No se encontró el curso con código {codigo_curso}")
+                return None
+            
+            response = self.client.table('sesiones')\
+                .select('id, nombre, fecha, puntaje_maximo')\
+                .eq('curso_id', curso_id)\
+                .order('fecha')\
+                .execute()
+            df_sesiones = pd.DataFrame(response.data, columns=['id', 'nombre', 'fecha', 'puntaje_maximo'])
+            
+            df_alumnos, df_puntajes = self._leer_alumnos_y_puntajes(curso_id, df_sesiones)
+            
+            return {
+                'alumnos': df_alumnos,
+                'sesiones': df_sesiones,
+                'matriz': construir_matriz_puntajes(df_alumnos, df_sesiones, df_puntajes)
+            }
+            
+        except Exception as e:
+            self._error_lectura(f"Error al obtener libro de calificaciones: {str(e)}")
+            return None
+
+    @_invalida('evaluaciones', 'evaluaciones_sesiones')
+    def limpiar_evaluaciones_temporales(self, nombre='temp_eval'):
+        """
+        Elimina las evaluaciones temporales que dejaba la previsualización anterior
+        Retorna la cantidad de evaluaciones eliminadas o None si hay error
+        """
+        try:
+            response = self.client.table('evaluaciones')\
+                .select('id')\
+                .eq('nombre', nombre)\
+                .execute()
+            
+            ids = [e['id'] for e in response.data]
+            if not ids:
+                return 0
+            
+            # Primero eliminar las relaciones con sesiones
+            self.client.table('evaluaciones_sesiones')\
+                .delete()\
+                .in_('evaluacion_id', ids)\
+                .execute()
             
-            return pd.DataFrame(resultados)
+            # Luego eliminar las evaluaciones
+            self.client.table('evaluaciones')\
+                .delete()\
+                .in_('id', ids)\
+                .execute()
+            
+            return len(ids)
             
         except Exception as e:
-            st.error(f"Error al obtener resultados de evaluación: {str(e)}")
+            st.error(f"Error al limpiar evaluaciones temporales: {str(e)}")
             return None
 
+    def obtener_resultados_evaluacion(self, evaluacion_id):
+        """Obtiene los resultados detallados de una evaluación"""
+        detalle = self.obtener_detalle_evaluacion(evaluacion_id)
+        if detalle is None:
+            return None
+        return detalle['resultados']
+
+    @_invalida('evaluaciones', 'evaluaciones_sesiones')
     def crear_evaluacion(self, codigo_curso, nombre_evaluacion, escala, sesiones_ids, fecha=None):
         """Crea una nueva evaluación"""
         try:
             # Obtener ID del curso
-            curso = self.client.table('cursos')\
-                .select('id')\
-                .eq('codigo', codigo_curso)\
-                .single()\
-                .execute()
+            curso_id = self._obtener_curso_id(codigo_curso)
             
-            if not curso.data:
+            if curso_id is None:
                 st.error(f"No se encontró el curso con código {codigo_curso}")
                 return None
             
@@ -584,7 +1471,7 @@ class SupabaseManager:
                 fecha = datetime.now()
                 
             evaluacion = self.client.table('evaluaciones').insert({
-                'curso_id': curso.data['id'],
+                'curso_id': curso_id,
                 'nombre': nombre_evaluacion,
                 'escala': escala,
                 'fecha': fecha.strftime('%Y-%m-%d')
@@ -605,6 +1492,7 @@ class SupabaseManager:
             st.error(f"Error al crear evaluación: {str(e)}")
             return None
 
+    @_invalida('evaluaciones', 'evaluaciones_sesiones')
     def eliminar_evaluacion(self, evaluacion_id):
         """Elimina una evaluación y sus relaciones"""
         try:
@@ -626,4 +1514,13 @@ class SupabaseManager:
             st.error(f"Error al eliminar evaluación: {str(e)}")
             return False
     
-    
\ No newline at end of file
+    
+
+@st.cache_resource
+def obtener_manager():
+    """
+    Retorna el SupabaseManager compartido por todas las sesiones del proceso
+    Un solo cliente HTTP (con su pool de conexiones) y una sola verificación de tablas
+    Cada solicitud del cliente queda medida por la instrumentación
+    """
+    return SupabaseManager(obtener_instrumentacion().envolver(crear_cliente()))
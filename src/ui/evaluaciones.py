@@ -2,17 +2,21 @@ import streamlit as st
 from datetime import datetime
 import pandas as pd
 import plotly.express as px
+from ..utils.escenarios import comparar_escenarios
 
 def evaluaciones_ui(db):
     st.title("🎯 Evaluaciones")
     
-    tab1, tab2 = st.tabs(["📝 Crear Evaluación", "📊 Ver Evaluaciones"])
+    tab1, tab2, tab3 = st.tabs(["📝 Crear Evaluación", "📊 Ver Evaluaciones", "🧪 Escenarios"])
     
     with tab1:
         crear_evaluacion(db)
     
     with tab2:
         ver_evaluaciones(db)
+    
+    with tab3:
+        comparar_escenarios_ui(db)
 
 def calcular_nota(puntaje, puntaje_maximo, escala):
     """Calcula la nota en base a la escala definida"""
@@ -80,123 +84,100 @@ def crear_evaluacion(db):
                 sesiones_seleccionadas.append(sesion['id'])
     
     if len(sesiones_seleccionadas) > 0:
-        if st.button("👀 Previsualizar Evaluación", use_container_width=True):
-            try:
-                evaluacion_temp_id = db.crear_evaluacion(
-                    indice_curso,
-                    "temp_eval",
-                    escala,
-                    sesiones_seleccionadas,
-                    fecha_evaluacion
-                )
-                
-                if evaluacion_temp_id is None:
-                    st.error("Error al crear la evaluación temporal")
-                    return
-                
-                # Obtener resultados
-                df_resultados = db.obtener_resultados_evaluacion(evaluacion_temp_id)
-                
-                if df_resultados is None or df_resultados.empty:
-                    st.warning("No hay resultados disponibles para mostrar")
-                    return
-                
-                # Asegurar tipos de datos correctos
-                df_resultados = df_resultados.fillna(0)
-                df_resultados['Puntaje Total'] = df_resultados['Puntaje Total'].astype(float)
-                df_resultados['Máximo Posible'] = df_resultados['Máximo Posible'].astype(float)
-                df_resultados['Nota'] = df_resultados['Nota'].astype(float)
-                
-                # Contenedor para previsualización
-                with st.container():
-                    st.markdown("### 📊 Resultados Preliminares")
-                    
-                    # Estadísticas
-                    col1, col2, col3, col4 = st.columns(4)
-                    with col1:
-                        st.metric("📊 Promedio", f"{df_resultados['Nota'].mean():.2f}")
-                    with col2:
-                        st.metric("⬆️ Nota más alta", f"{df_resultados['Nota'].max():.2f}")
-                    with col3:
-                        st.metric("⬇️ Nota más baja", f"{df_resultados['Nota'].min():.2f}")
-                    with col4:
-                        st.metric("📝 Total Alumnos", len(df_resultados))
-                    
-                    # Tabla de resultados
-                    st.dataframe(
-                        df_resultados.sort_values('Nota', ascending=False),
-                        column_config={
-                            "Alumno": st.column_config.TextColumn(
-                                "Alumno",
-                                help="Nombre completo del alumno"
-                            ),
-                            "Puntaje Total": st.column_config.NumberColumn(
-                                "Puntaje Total",
-                                help="Suma de puntajes de todas las sesiones",
-                                format="%.1f ✨"
-                            ),
-                            "Máximo Posible": st.column_config.NumberColumn(
-                                "Máximo Posible",
-                                help="Puntaje máximo alcanzable",
-                                format="%.1f ✨"
-                            ),
-                            "Nota": st.column_config.NumberColumn(
-                                "Nota",
-                                help=f"Calificación en escala de {escala}",
-                                format="%.2f"
-                            )
-                        },
-                        hide_index=True,
-                        use_container_width=True
-                    )
-                    
-                    # Gráfico de distribución
-                    fig = px.histogram(
-                        df_resultados, 
-                        x='Nota', 
-                        nbins=20,
-                        title='Distribución de Notas',
-                        labels={'Nota': f'Nota (escala {escala})', 'count': 'Cantidad de Alumnos'},
-                        color_discrete_sequence=['#0066cc']
+        # Previsualización calculada en memoria: no escribe en la base de datos
+        detalle = db.previsualizar_evaluacion(indice_curso, escala, sesiones_seleccionadas)
+        
+        if detalle is None or detalle['resultados'].empty:
+            st.warning("No hay resultados disponibles para mostrar")
+            return
+        
+        df_resultados = detalle['resultados']
+        
+        # Contenedor para previsualización
+        with st.container():
+            st.markdown("### 📊 Resultados Preliminares")
+            
+            # Estadísticas
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("📊 Promedio", f"{df_resultados['Nota'].mean():.2f}")
+            with col2:
+                st.metric("⬆️ Nota más alta", f"{df_resultados['Nota'].max():.2f}")
+            with col3:
+                st.metric("⬇️ Nota más baja", f"{df_resultados['Nota'].min():.2f}")
+            with col4:
+                st.metric("📝 Total Alumnos", len(df_resultados))
+            
+            # Tabla de resultados
+            st.dataframe(
+                df_resultados.sort_values('Nota', ascending=False),
+                column_config={
+                    "Alumno": st.column_config.TextColumn(
+                        "Alumno",
+                        help="Nombre completo del alumno"
+                    ),
+                    "Puntaje Total": st.column_config.NumberColumn(
+                        "Puntaje Total",
+                        help="Suma de puntajes de todas las sesiones",
+                        format="%.1f ✨"
+                    ),
+                    "Puntaje Máximo": st.column_config.NumberColumn(
+                        "Máximo Posible",
+                        help="Puntaje máximo alcanzable",
+                        format="%.1f ✨"
+                    ),
+                    "Nota": st.column_config.NumberColumn(
+                        "Nota",
+                        help=f"Calificación en escala de {escala}",
+                        format="%.2f"
                     )
-                    fig.update_layout(
-                        showlegend=False,
-                        plot_bgcolor='white',
-                        paper_bgcolor='white',
-                        margin=dict(t=50, l=0, r=0, b=0)
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+            
+            # Gráfico de distribución
+            fig = px.histogram(
+                df_resultados, 
+                x='Nota', 
+                nbins=20,
+                title='Distribución de Notas',
+                labels={'Nota': f'Nota (escala {escala})', 'count': 'Cantidad de Alumnos'},
+                color_discrete_sequence=['#0066cc']
+            )
+            fig.update_layout(
+                showlegend=False,
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                margin=dict(t=50, l=0, r=0, b=0)
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Botones de acción
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("💾 Guardar Evaluación", use_container_width=True):
+                    evaluacion_id = db.crear_evaluacion(
+                        indice_curso,
+                        nombre_evaluacion,
+                        escala,
+                        sesiones_seleccionadas,
+                        fecha_evaluacion
                     )
-                    st.plotly_chart(fig, use_container_width=True)
-                    
-                    # Botones de acción
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button("💾 Guardar Evaluación", use_container_width=True):
-                            evaluacion_id = db.crear_evaluacion(
-                                indice_curso,
-                                nombre_evaluacion,
-                                escala,
-                                sesiones_seleccionadas,
-                                fecha_evaluacion
-                            )
-                            
-                            if evaluacion_id:
-                                st.success("✅ ¡Evaluación creada exitosamente!")
-                                st.balloons()
                     
-                    with col2:
-                        if not df_resultados.empty:
-                            csv = df_resultados.to_csv().encode('utf-8')
-                            st.download_button(
-                                label="📥 Descargar Resultados (CSV)",
-                                data=csv,
-                                file_name=f'{nombre_evaluacion}_{datetime.now().strftime("%Y%m%d")}.csv',
-                                mime='text/csv',
-                                use_container_width=True
-                            )
-                            
-            except Exception as e:
-                st.error(f"Error al procesar la evaluación: {str(e)}")
-                return
+                    if evaluacion_id:
+                        st.success("✅ ¡Evaluación creada exitosamente!")
+                        st.balloons()
+            
+            with col2:
+                csv = df_resultados.to_csv().encode('utf-8')
+                st.download_button(
+                    label="📥 Descargar Resultados (CSV)",
+                    data=csv,
+                    file_name=f'{nombre_evaluacion}_{datetime.now().strftime("%Y%m%d")}.csv',
+                    mime='text/csv',
+                    use_container_width=True
+                )
     else:
         st.info("ℹ️ Selecciona al menos una sesión para crear la evaluación")
 
@@ -215,7 +196,8 @@ def ver_evaluaciones(db):
     )
     indice_curso = indices_cursos[nombres_cursos.index(curso_seleccionado)]
     
-    evaluaciones = db.obtener_evaluaciones_curso(indice_curso)
+    # Solo encabezados para el selector; las sesiones se cargan al elegir una
+    evaluaciones = db.obtener_evaluaciones_curso(indice_curso, solo_encabezados=True)
     if not evaluaciones:
         st.info("📝 No hay evaluaciones registradas para este curso.")
         return
@@ -245,7 +227,7 @@ def ver_evaluaciones(db):
         # Mostrar sesiones incluidas en una grid
         with st.expander("📎 Sesiones incluidas"):
             cols = st.columns(2)
-            for idx, sesion in enumerate(evaluacion['sesiones']):
+            for idx, sesion in enumerate(db.obtener_sesiones_evaluacion(evaluacion['id'])):
                 with cols[idx % 2]:
                     st.markdown(f"""
                         <div style='
@@ -287,7 +269,7 @@ def ver_evaluaciones(db):
                         help="Suma de puntajes de todas las sesiones",
                         format="%.1f ✨"
                     ),
-                    "Máximo Posible": st.column_config.NumberColumn(
+                    "Puntaje Máximo": st.column_config.NumberColumn(
                         "Máximo Posible",
                         help="Puntaje máximo alcanzable",
                         format="%.1f ✨"
@@ -336,4 +318,90 @@ def ver_evaluaciones(db):
                 if st.button("🗑️ Eliminar Evaluación", type="primary", use_container_width=True):
                     if db.eliminar_evaluacion(evaluacion['id']):
                         st.success("✅ Evaluación eliminada exitosamente")
-                        st.rerun()
\ No newline at end of file
+                        st.rerun()
+
+def comparar_escenarios_ui(db):
+    """Compara varias configuraciones de calificación sin volver a la base de datos"""
+    st.markdown("### 🧪 Comparar Escenarios de Calificación")
+    
+    indices_cursos, nombres_cursos = db.obtener_lista_cursos()
+    if not indices_cursos:
+        st.warning("🚫 No hay cursos disponibles.")
+        return
+    
+    curso_seleccionado = st.selectbox(
+        "📚 Selecciona el curso",
+        nombres_cursos,
+        key="escenarios_curso"
+    )
+    indice_curso = indices_cursos[nombres_cursos.index(curso_seleccionado)]
+    
+    # El libro de calificaciones se carga una vez por curso
+    clave_libro = f"libro_calificaciones_{indice_curso}"
+    if st.button("🔄 Recargar puntajes", key="recargar_libro") or clave_libro not in st.session_state:
+        st.session_state[clave_libro] = db.obtener_libro_calificaciones(indice_curso)
+    libro = st.session_state[clave_libro]
+    
+    if libro is None or libro['sesiones'].empty or libro['alumnos'].empty:
+        st.warning("⚠️ El curso necesita alumnos y sesiones para comparar escenarios.")
+        return
+    
+    df_sesiones = libro['sesiones']
+    columnas_sesiones = [f"{s['nombre']} ({s['fecha']}) #{s['id']}" for _, s in df_sesiones.iterrows()]
+    
+    # Cada fila es un escenario; las columnas de sesiones indican cuáles incluye
+    df_escenarios = pd.DataFrame([
+        {'Escenario': 'Base', 'Escala': 20, 'Descartar peores': 0},
+        {'Escenario': 'Sin la peor sesión', 'Escala': 20, 'Descartar peores': 1}
+    ])
+    for columna in columnas_sesiones:
+        df_escenarios[columna] = True
+    
+    st.caption("Edita, agrega o quita escenarios. El primero se usa como referencia para las diferencias.")
+    df_escenarios = st.data_editor(
+        df_escenarios,
+        column_config={
+            "Escala": st.column_config.NumberColumn("Escala", min_value=1, step=1),
+            "Descartar peores": st.column_config.NumberColumn("Descartar peores", min_value=0, step=1),
+            **{columna: st.column_config.CheckboxColumn(columna) for columna in columnas_sesiones}
+        },
+        num_rows="dynamic",
+        hide_index=True,
+        key=f"editor_escenarios_{indice_curso}"
+    ).dropna(subset=['Escenario', 'Escala'])
+    
+    if df_escenarios.empty:
+        st.info("ℹ️ Agrega al menos un escenario")
+        return
+    
+    df_escenarios['Descartar peores'] = df_escenarios['Descartar peores'].fillna(0)
+    seleccion = df_escenarios[columnas_sesiones].fillna(False).to_numpy(dtype=bool)
+    
+    nombres = df_escenarios['Escenario'].astype(str).str.strip()
+    if nombres.duplicated().any() or nombres.isin(['Apellido', 'Nombre']).any():
+        st.warning("⚠️ Hay escenarios con nombres repetidos; se numeraron para distinguirlos")
+    
+    escenarios = [
+        {
+            'nombre': str(fila['Escenario']).strip(),
+            'escala': fila['Escala'],
+            'descartar_peores': int(fila['Descartar peores']),
+            'sesiones': seleccion[k]
+        } for k, (_, fila) in enumerate(df_escenarios.iterrows())
+    ]
+    
+    resultado = comparar_escenarios(
+        libro['alumnos'],
+        libro['matriz'],
+        df_sesiones['puntaje_maximo'].to_numpy(),
+        escenarios
+    )
+    
+    st.markdown("#### 📊 Comparación")
+    st.dataframe(resultado['comparacion'].round(2), use_container_width=True)
+    
+    st.markdown("#### 📈 Diferencias por alumno")
+    st.dataframe(resultado['deltas'], hide_index=True, use_container_width=True)
+    
+    with st.expander("Ver notas por escenario"):
+        st.dataframe(resultado['notas'], hide_index=True, use_container_width=True)
@@ -1,7 +1,14 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import io
 from datetime import datetime
+from ..config.importador import ESTADOS_ACTIVOS, obtener_importador
+from ..utils.lectura import COLUMNAS_ALUMNOS, leer_alumnos_por_bloques, leer_texto_por_bloques
+from ..utils.validators import claves_normalizadas, validar_alumnos
+
+# Segundos entre consultas al avance de una importación
+INTERVALO_SONDEO = 1
 
 def importacion_ui(db):
     st.title("Importación de Cursos y Alumnos")
@@ -17,6 +24,14 @@ def importacion_ui(db):
 def importar_datos(db):
     st.header("Importar Nuevo Curso")
     
+    # Las importaciones en curso se listan arriba, pero después de saber cuál dibuja el formulario
+    en_curso = st.container()
+    st.session_state.importacion_mostrada = None
+    formulario_importacion(db)
+    with en_curso:
+        mostrar_importaciones_en_curso()
+
+def formulario_importacion(db):
     # Sección de información del curso
     with st.form("info_curso"):
         st.subheader("1. Información del Curso")
@@ -70,17 +85,18 @@ def importar_desde_archivo(db):
     )
     
     if uploaded_file is not None:
+        def leer_bloques():
+            uploaded_file.seek(0)
+            return leer_alumnos_por_bloques(uploaded_file, uploaded_file.name)
+        
         try:
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file, engine='openpyxl')
-            
-            if validar_formato_alumnos(df):
-                mostrar_preview_y_guardar(db, df)
-            
+            # Solo se lee el primer bloque para la vista previa
+            df_preview = next(leer_bloques(), pd.DataFrame(columns=COLUMNAS_ALUMNOS))
         except Exception as e:
             st.error(f"Error al leer el archivo: {str(e)}")
+            return
+        
+        mostrar_preview_y_guardar(db, df_preview, leer_bloques)
 
 def importar_desde_texto(db):
     st.info("""
@@ -91,6 +107,7 @@ def importar_desde_texto(db):
     López,María
     ...
     ```
+    También se aceptan datos separados por punto y coma o pegados desde una hoja de cálculo.
     """)
     
     texto_datos = st.text_area(
@@ -101,20 +118,20 @@ def importar_desde_texto(db):
     
     if st.button("Procesar datos"):
         if texto_datos:
-            try:
-                # Convertir texto a DataFrame
-                df = pd.DataFrame([
-                    line.split(',') for line in texto_datos.strip().split('\n')
-                ])
-                if len(df.columns) >= 2:
-                    df.columns = df.iloc[0]
-                    df = df[1:]
-                    if validar_formato_alumnos(df):
-                        mostrar_preview_y_guardar(db, df)
-                else:
-                    st.error("Formato incorrecto. Asegúrese de separar los datos con comas.")
-            except Exception as e:
-                st.error(f"Error al procesar los datos: {str(e)}")
+            st.session_state.texto_importacion = texto_datos
+    
+    texto = st.session_state.get('texto_importacion')
+    if texto:
+        def leer_bloques():
+            return leer_texto_por_bloques(texto)
+        
+        try:
+            df_preview = next(leer_bloques(), pd.DataFrame(columns=COLUMNAS_ALUMNOS))
+        except Exception as e:
+            st.error(f"Error al procesar los datos: {str(e)}")
+            return
+        
+        mostrar_preview_y_guardar(db, df_preview, leer_bloques)
 
 def importar_manual(db):
     if 'alumnos_manual' not in st.session_state:
@@ -141,32 +158,59 @@ def importar_manual(db):
         st.dataframe(st.session_state.alumnos_manual)
         
         if st.button("Guardar Lista de Alumnos"):
-            mostrar_preview_y_guardar(db, st.session_state.alumnos_manual)
+            if validar_formato_alumnos(st.session_state.alumnos_manual):
+                mostrar_preview_y_guardar(db, st.session_state.alumnos_manual)
 
 def validar_formato_alumnos(df):
     """Valida el formato del DataFrame de alumnos"""
-    columnas_requeridas = ['Apellido', 'Nombre']
-    
-    # Verificar columnas
-    if not all(col in df.columns for col in columnas_requeridas):
-        st.error(f"El archivo debe contener las columnas: {', '.join(columnas_requeridas)}")
+    errores = validar_alumnos(df)
+    if not errores.empty:
+        st.error(f"Se encontraron {len(errores)} problemas en la lista de alumnos:")
+        st.dataframe(errores, hide_index=True)
         return False
     
-    # Verificar datos vacíos
-    if df['Apellido'].isna().any() or df['Nombre'].isna().any():
-        st.error("Existen datos vacíos en la lista de alumnos")
-        return False
+    return True
+
+def validar_bloque_alumnos(df, vistos):
+    """
+    Separa un bloque de alumnos en filas válidas y rechazadas (con el detalle de sus errores)
+    vistos: claves normalizadas de los bloques anteriores; se actualiza con las nuevas
+    """
+    errores = validar_alumnos(df, vistos)
+    detalle = errores.groupby('Fila')['Error'].agg(', '.join)
     
-    # Verificar duplicados
-    duplicados = df.duplicated(subset=['Apellido', 'Nombre'], keep=False)
-    if duplicados.any():
-        st.error("Existen alumnos duplicados en la lista:")
-        st.dataframe(df[duplicados])
-        return False
+    rechazadas = np.zeros(len(df), dtype=bool)
+    rechazadas[detalle.index.to_numpy() - 1] = True
+    validos = df[~rechazadas].apply(lambda col: col.str.strip())
+    vistos.update(claves_normalizadas(validos))
     
-    return True
+    rechazados = [
+        {'Apellido': a, 'Nombre': n, 'Detalle': d}
+        for (a, n), d in zip(df.iloc[detalle.index - 1][COLUMNAS_ALUMNOS].fillna('').values.tolist(), detalle)
+    ]
+    return validos, rechazados
 
-def mostrar_preview_y_guardar(db, df):
+def entregar_bloques(importador, trabajo_id, leer_bloques):
+    """
+    Valida cada bloque leído y lo entrega al importador sin esperar al resto del archivo
+    Si la lectura falla, el trabajo se cierra como incompleto con el motivo
+    """
+    vistos = set()
+    try:
+        for bloque in leer_bloques():
+            validos, rechazados = validar_bloque_alumnos(bloque, vistos)
+            importador.agregar_filas(trabajo_id, validos, rechazados)
+    except Exception as e:
+        importador.cerrar(trabajo_id, error=str(e))
+    else:
+        importador.cerrar(trabajo_id)
+
+def mostrar_preview_y_guardar(db, df, leer_bloques=None):
+    """
+    Muestra la vista previa, crea el curso y encola la importación
+    leer_bloques: función que retorna los bloques del archivo; si se indica, df es solo
+    la vista previa y los bloques se validan y se entregan al importador a medida que se leen
+    """
     st.write("### Vista previa de los datos:")
     st.dataframe(df)
     
@@ -225,51 +269,96 @@ def mostrar_preview_y_guardar(db, df):
 
     # Proceso de agregar alumnos si el curso fue creado
     if st.session_state.proceso_estado['iniciado'] and st.session_state.proceso_estado['curso_creado']:
-        try:
-            estado_container.info("Agregando alumnos a Supabase...")
-            progress_bar = st.progress(0)
-            
-            # Continuar desde donde quedamos
-            start_idx = st.session_state.proceso_estado['alumnos_agregados']
-            
-            for idx, row in df.iloc[start_idx:].iterrows():
-                try:
-                    # Debug: Mostrar intento de agregar alumno
-                    st.write(f"Intentando agregar alumno: {row['Apellido']}, {row['Nombre']}")
-                    
-                    resultado = db.agregar_alumno(
-                        st.session_state.codigo_curso,
-                        row['Apellido'].strip(),
-                        row['Nombre'].strip()
-                    )
-                    
-                    if resultado:
-                        st.session_state.proceso_estado['alumnos_agregados'] += 1
-                    else:
-                        st.session_state.proceso_estado['errores'].append(
-                            f"No se pudo agregar: {row['Apellido']}, {row['Nombre']}"
-                        )
-                    
-                    # Actualizar progreso
-                    progress = (st.session_state.proceso_estado['alumnos_agregados'] / len(df))
-                    progress_bar.progress(progress)
-                    
-                except Exception as e:
-                    st.session_state.proceso_estado['errores'].append(
-                        f"Error al agregar {row['Apellido']}, {row['Nombre']}: {str(e)}"
-                    )
+        importador = obtener_importador()
+        
+        # La importación se encola una sola vez; corre en segundo plano aunque se cambie de página
+        if not st.session_state.proceso_estado.get('trabajo_id'):
+            if leer_bloques is None:
+                trabajo_id = importador.enviar(st.session_state.codigo_curso, df)
+            else:
+                trabajo_id = importador.abrir(st.session_state.codigo_curso)
+            st.session_state.proceso_estado['trabajo_id'] = trabajo_id
+            st.session_state.setdefault('trabajos_importacion', []).append(trabajo_id)
             
-            # Marcar como completado si llegamos al final
-            if st.session_state.proceso_estado['alumnos_agregados'] == len(df):
-                st.session_state.proceso_estado['completado'] = True
-                estado_container.success("✅ Proceso completado exitosamente!")
+            if leer_bloques is not None:
+                entregar_bloques(importador, trabajo_id, leer_bloques)
+        
+        trabajo = importador.estado(st.session_state.proceso_estado['trabajo_id'])
+        st.session_state.importacion_mostrada = st.session_state.proceso_estado['trabajo_id']
+        if trabajo is None:
+            estado_container.warning("No se encontró la importación solicitada")
+        elif trabajo['estado'] == 'error':
+            estado_container.error(f"❌ Error en el proceso: {trabajo['mensaje']}")
+        elif trabajo['estado'] == 'completado':
+            estado_container.empty()
+            st.session_state.proceso_estado['alumnos_agregados'] = trabajo['conteo']['Agregado']
+            st.session_state.proceso_estado['errores'] = [
+                f"{r['Apellido']}, {r['Nombre']}: {r['Detalle']}" for r in trabajo['errores']
+            ]
+            st.session_state.proceso_estado['completado'] = True
+            mostrar_resultado_importacion(trabajo)
+        else:
+            if trabajo.get('incompleto'):
+                estado_container.warning(f"⚠️ {trabajo['mensaje']}")
+            else:
+                estado_container.info("Agregando alumnos a Supabase en segundo plano...")
+            mostrar_progreso_importacion(importador, trabajo['id'])
 
-        except Exception as e:
-            estado_container.error(f"❌ Error en el proceso: {str(e)}")
-            st.write("Detalles del error:", {
-                "tipo": type(e).__name__,
-                "mensaje": str(e)
-            })
+@st.fragment(run_every=INTERVALO_SONDEO)
+def mostrar_progreso_importacion(importador, trabajo_id):
+    """
+    Consulta el avance del trabajo de importación
+    Es un fragmento: cada sondeo solo vuelve a dibujar este bloque
+    Al terminar el trabajo se vuelve a ejecutar la página, que ya no sondea y muestra el resultado
+    """
+    trabajo = importador.estado(trabajo_id)
+    if trabajo is None or trabajo['estado'] not in ESTADOS_ACTIVOS:
+        st.rerun()
+    
+    procesados = trabajo['desplazamiento']
+    total = trabajo['total']
+    st.progress(procesados / total if total else 1.0, text=f"{procesados} de {total} alumnos")
+
+def mostrar_resultado_importacion(trabajo):
+    """Muestra el resumen de la importación y las filas que no se agregaron"""
+    conteo = trabajo['conteo']
+    if trabajo.get('incompleto'):
+        st.warning(f"⚠️ Importación incompleta: {trabajo['mensaje']}")
+    elif conteo['Error']:
+        st.warning("⚠️ Proceso completado con errores")
+    else:
+        st.success("✅ Proceso completado exitosamente!")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Agregados", conteo['Agregado'])
+    with col2:
+        st.metric("Duplicados", conteo['Duplicado'])
+    with col3:
+        st.metric("Errores", conteo['Error'])
+    
+    if trabajo['errores']:
+        with st.expander("Ver alumnos no agregados"):
+            st.dataframe(pd.DataFrame(trabajo['errores']), hide_index=True)
+
+def mostrar_importaciones_en_curso():
+    """
+    Lista las importaciones de esta sesión que todavía se están procesando
+    La que el formulario ya mostró en esta ejecución no se repite
+    """
+    importador = obtener_importador()
+    actual = st.session_state.get('importacion_mostrada')
+    activos = [
+        trabajo for trabajo in map(importador.estado, st.session_state.get('trabajos_importacion', []))
+        if trabajo and trabajo['estado'] in ESTADOS_ACTIVOS and trabajo['id'] != actual
+    ]
+    if not activos:
+        return
+    
+    with st.expander(f"⏳ {len(activos)} importaciones en curso", expanded=True):
+        for trabajo in activos:
+            st.caption(f"Curso {trabajo['codigo_curso']} · iniciada {trabajo['creado']}")
+            mostrar_progreso_importacion(importador, trabajo['id'])
 
 def descargar_plantillas():
     st.header("Plantillas de Importación")
@@ -0,0 +1,66 @@
+import streamlit as st
+import pandas as pd
+from ..config.instrumentacion import obtener_instrumentacion
+
+def rendimiento_ui(db):
+    """Panel de rendimiento: consultas por ejecución y página, latencias y caché"""
+    st.title("Rendimiento")
+    instrumentacion = obtener_instrumentacion()
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        umbral_ms = st.number_input(
+            "Umbral de consulta lenta (ms)",
+            min_value=10,
+            step=50,
+            value=int(instrumentacion.umbral_lento * 1000)
+        )
+        instrumentacion.umbral_lento = umbral_ms / 1000
+    with col2:
+        if st.button("🗑️ Reiniciar métricas"):
+            instrumentacion.reiniciar()
+            st.rerun()
+    
+    # Últimas ejecuciones del script (la actual todavía no terminó)
+    st.subheader("Últimas ejecuciones")
+    df_ejecuciones = pd.DataFrame(list(instrumentacion.ejecuciones))
+    if df_ejecuciones.empty:
+        st.info("Todavía no hay ejecuciones registradas")
+    else:
+        df_ejecuciones['tiempo_ms'] = (df_ejecuciones['tiempo'] * 1000).round(1)
+        st.dataframe(
+            df_ejecuciones.iloc[::-1].head(20)[['hora', 'pagina', 'consultas', 'tiempo_ms', 'filas', 'errores']],
+            hide_index=True
+        )
+    
+    st.subheader("Por página")
+    resumen = instrumentacion.resumen_por_pagina()
+    if resumen.empty:
+        st.info("Todavía no hay consultas registradas")
+    else:
+        st.dataframe(resumen, hide_index=True)
+        st.subheader("Por tabla y operación")
+        st.dataframe(instrumentacion.resumen_por_tabla(), hide_index=True)
+    
+    st.subheader(f"Consultas lentas (≥ {umbral_ms} ms)")
+    if instrumentacion.lentas:
+        df_lentas = pd.DataFrame(list(instrumentacion.lentas))
+        df_lentas['latencia_ms'] = (df_lentas['latencia'] * 1000).round(1)
+        st.dataframe(
+            df_lentas.iloc[::-1][['hora', 'pagina', 'operacion', 'tabla', 'filtros', 'latencia_ms', 'filas', 'error']],
+            hide_index=True
+        )
+    else:
+        st.caption("Sin consultas lentas")
+    
+    st.subheader("Caché de consultas")
+    estadisticas = db.cache.estadisticas()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Aciertos", estadisticas['aciertos'])
+    with col2:
+        st.metric("Fallos", estadisticas['fallos'])
+    with col3:
+        st.metric("Tasa de aciertos", f"{estadisticas['tasa_aciertos']:.0%}")
+    if estadisticas['por_metodo']:
+        st.dataframe(pd.DataFrame(estadisticas['por_metodo']).T)
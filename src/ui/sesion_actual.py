@@ -1,5 +1,11 @@
 import streamlit as st
 import pandas as pd
+import math
+from bisect import bisect_left
+from ..utils.validators import normalizar_nombre, validar_puntaje_maximo
+
+# Opciones de alumnos por página en la vista de botones
+OPCIONES_TAMANO_PAGINA = [10, 25, 50, 100]
 
 def sesion_actual_ui(db):
     """Interfaz para la sesión actual"""
@@ -52,18 +58,34 @@ def sesion_actual_ui(db):
             </div>
         """, unsafe_allow_html=True)
         
-        vista = st.radio(
-            "Tipo de vista",
-            ["Botones", "Tabla"],
-            horizontal=True,
-            key="tipo_vista_actual"
-        )
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            vista = st.radio(
+                "Tipo de vista",
+                ["Botones", "Tabla"],
+                horizontal=True,
+                key="tipo_vista_actual"
+            )
+        with col2:
+            escritura_diferida = st.toggle(
+                "⚡ Escritura diferida",
+                key="escritura_diferida",
+                help="Agrupa los clics y los guarda en lote cada pocos segundos"
+            )
+        
+        # Guardar lo pendiente al cambiar de sesión o al desactivar la escritura diferida
+        if st.session_state.get('sesion_actual_id') != sesion['id'] or not escritura_diferida:
+            db.vaciar_escritura_diferida()
+        st.session_state.sesion_actual_id = sesion['id']
+        if escritura_diferida:
+            mostrar_estado_escritura(db)
         
         # Obtener y preparar datos de puntajes
         df_puntajes = db.obtener_puntajes_sesion(sesion['id'])
         if df_puntajes.empty:
             df_puntajes = db.leer_alumnos_curso(indice_curso)
             df_puntajes['Puntaje'] = 0
+        df_puntajes = db.aplicar_puntajes_pendientes(sesion['id'], df_puntajes)
         
         # Ordenar alfabéticamente por apellido y nombre
         df_puntajes = df_puntajes.sort_values(['Apellido', 'Nombre']).reset_index(drop=True)
@@ -73,6 +95,26 @@ def sesion_actual_ui(db):
         else:
             mostrar_vista_tabla_edicion(db, df_puntajes, sesion)
 
+def mostrar_estado_escritura(db):
+    """Muestra los cambios pendientes de la escritura diferida y sus fallos"""
+    estado = db.estado_escritura_diferida()
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        ultimo = estado['ultimo_vaciado']
+        st.caption(
+            f"⏳ {estado['pendientes']} cambios pendientes · "
+            f"Último guardado: {ultimo.strftime('%H:%M:%S') if ultimo else '—'}"
+        )
+    with col2:
+        if st.button("💾 Guardar ahora", key="vaciar_escritura"):
+            db.vaciar_escritura_diferida()
+            st.rerun()
+    
+    if estado['fallos']:
+        with st.expander(f"⚠️ {len(estado['fallos'])} escrituras fallidas (se reintentarán)"):
+            st.dataframe(pd.DataFrame(estado['fallos']), hide_index=True)
+
 def mostrar_vista_botones_edicion(db, df_puntajes, sesion):
     """Vista de botones simplificada y funcional en una columna"""
     # CSS personalizado para los botones
@@ -93,80 +135,169 @@ def mostrar_vista_botones_edicion(db, df_puntajes, sesion):
         </style>
     """, unsafe_allow_html=True)
     
+    # Búsqueda y tamaño de página
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        busqueda = st.text_input(
+            "🔎 Buscar alumno",
+            placeholder="Apellido o nombre",
+            key=f"buscar_alumno_{sesion['id']}"
+        )
+    with col2:
+        tamano_pagina = st.selectbox(
+            "Alumnos por página",
+            OPCIONES_TAMANO_PAGINA,
+            index=1,
+            key="tamano_pagina_alumnos"
+        )
+    
+    if busqueda.strip():
+        posiciones = buscar_por_prefijo(obtener_indice_prefijos(df_puntajes), busqueda)
+        if not posiciones:
+            st.info(f"No se encontraron alumnos que empiecen con '{busqueda}'")
+            return
+    else:
+        posiciones = range(len(df_puntajes))
+    
+    # Solo se dibuja la ventana de la página actual
+    total_paginas = max(1, math.ceil(len(posiciones) / tamano_pagina))
+    clave_pagina = f"pagina_alumnos_{sesion['id']}"
+    st.session_state[clave_pagina] = min(st.session_state.get(clave_pagina, 1), total_paginas)
+    if total_paginas > 1:
+        pagina = st.number_input(
+            f"Página (de {total_paginas})",
+            min_value=1,
+            max_value=total_paginas,
+            step=1,
+            key=clave_pagina
+        )
+    else:
+        pagina = 1
+    inicio = (pagina - 1) * tamano_pagina
+    
     # Contenedor principal
     with st.container():
-        for idx, alumno in df_puntajes.iterrows():
-            with st.container():
-                # Contenedor para cada alumno con número de índice
-                st.markdown(f"""
-                    <div style='
-                        background-color: #f8f9fa;
-                        padding: 12px;
-                        border-radius: 8px;
-                        margin: 5px 0;
-                        box-shadow: 0 1px 2px rgba(0,0,0,0.1);
+        for idx in posiciones[inicio:inicio + tamano_pagina]:
+            alumno = df_puntajes.iloc[idx]
+            # El puntaje vive en session_state para que cada fila se actualice sola
+            st.session_state[clave_puntaje(sesion, alumno['Apellido'], alumno['Nombre'])] = int(alumno['Puntaje'])
+            mostrar_fila_alumno(db, sesion, idx + 1, alumno['Apellido'], alumno['Nombre'],
+                                st.session_state.get('escritura_diferida', False))
+
+def obtener_indice_prefijos(df_puntajes):
+    """
+    Índice ordenado [(texto normalizado, posición)] por "apellido nombre" y
+    "nombre apellido"; se reutiliza mientras el padrón no cambie
+    """
+    firma = hash((tuple(df_puntajes['Apellido']), tuple(df_puntajes['Nombre'])))
+    guardado = st.session_state.get('indice_prefijos_alumnos')
+    if guardado is not None and guardado[0] == firma:
+        return guardado[1]
+    
+    indice = []
+    for pos, (apellido, nombre) in enumerate(zip(df_puntajes['Apellido'], df_puntajes['Nombre'])):
+        indice.append((normalizar_nombre(f"{apellido} {nombre}"), pos))
+        indice.append((normalizar_nombre(f"{nombre} {apellido}"), pos))
+    indice.sort()
+    
+    st.session_state.indice_prefijos_alumnos = (firma, indice)
+    return indice
+
+def buscar_por_prefijo(indice, texto):
+    """Posiciones de los alumnos cuyo apellido o nombre empieza con el texto"""
+    prefijo = normalizar_nombre(texto)
+    posiciones = set()
+    i = bisect_left(indice, (prefijo,))
+    while i < len(indice) and indice[i][0].startswith(prefijo):
+        posiciones.add(indice[i][1])
+        i += 1
+    return sorted(posiciones)
+
+def clave_puntaje(sesion, apellido, nombre):
+    """Clave de session_state con el puntaje mostrado de un alumno"""
+    return f"puntaje_{sesion['id']}_{apellido}_{nombre}"
+
+@st.fragment
+def mostrar_fila_alumno(db, sesion, numero, apellido, nombre, diferido=False):
+    """
+    Fila de un alumno con sus botones ➖/➕
+    Es un fragmento: un clic solo vuelve a ejecutar y dibujar esta fila
+    """
+    clave = clave_puntaje(sesion, apellido, nombre)
+    puntaje = st.session_state[clave]
+    
+    with st.container():
+        # Contenedor para cada alumno con número de índice
+        st.markdown(f"""
+            <div style='
+                background-color: #f8f9fa;
+                padding: 12px;
+                border-radius: 8px;
+                margin: 5px 0;
+                box-shadow: 0 1px 2px rgba(0,0,0,0.1);
+            '>
+                <div style='
+                    display: flex;
+                    align-items: center;
+                    margin-bottom: 8px;
+                '>
+                    <span class='numero-alumno'>{numero}</span>
+                    <span style='
+                        font-size: 15px;
+                        color: #2c3e50;
+                        margin-left: 10px;
                     '>
-                        <div style='
-                            display: flex;
-                            align-items: center;
-                            margin-bottom: 8px;
-                        '>
-                            <span class='numero-alumno'>{idx + 1}</span>
-                            <span style='
-                                font-size: 15px;
-                                color: #2c3e50;
-                                margin-left: 10px;
-                            '>
-                                {alumno['Apellido']}, {alumno['Nombre']}
-                            </span>
-                        </div>
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                # Botones y puntaje en una línea
-                col1, col2, col3 = st.columns([1,2,1])
-                
-                with col1:
-                    minus_button = """➖"""
-                    if st.button(minus_button, key=f"dec_{alumno['Apellido']}_{alumno['Nombre']}", 
-                               use_container_width=True):
-                        nuevo_puntaje = max(0, alumno['Puntaje'] - 1)
-                        db.actualizar_puntaje_en_sesion(
-                            sesion['id'],
-                            alumno['Apellido'],
-                            alumno['Nombre'],
-                            nuevo_puntaje
-                        )
-                        st.rerun()
-                
-                with col2:
-                    st.markdown(f"""
-                        <div style='
-                            font-size: 20px;
-                            font-weight: bold;
-                            color: #0066cc;
-                            text-align: center;
-                            background-color: white;
-                            padding: 4px 10px;
-                            border-radius: 6px;
-                            box-shadow: 0 1px 2px rgba(0,0,0,0.1);
-                        '>
-                            {alumno['Puntaje']} / {sesion['puntaje_maximo']}
-                        </div>
-                    """, unsafe_allow_html=True)
-                
-                with col3:
-                    plus_button = """➕"""
-                    if st.button(plus_button, key=f"inc_{alumno['Apellido']}_{alumno['Nombre']}", 
-                               use_container_width=True):
-                        nuevo_puntaje = min(sesion['puntaje_maximo'], alumno['Puntaje'] + 1)
-                        db.actualizar_puntaje_en_sesion(
-                            sesion['id'],
-                            alumno['Apellido'],
-                            alumno['Nombre'],
-                            nuevo_puntaje
-                        )
-                        st.rerun()
+                        {apellido}, {nombre}
+                    </span>
+                </div>
+            </div>
+        """, unsafe_allow_html=True)
+        
+        # Botones y puntaje en una línea
+        col1, col2, col3 = st.columns([1,2,1])
+        
+        # Los botones se evalúan antes de dibujar el puntaje para mostrar el valor nuevo
+        delta = 0
+        with col1:
+            minus_button = """➖"""
+            if st.button(minus_button, key=f"dec_{apellido}_{nombre}", 
+                       use_container_width=True):
+                delta = -1
+        
+        with col3:
+            plus_button = """➕"""
+            if st.button(plus_button, key=f"inc_{apellido}_{nombre}", 
+                       use_container_width=True):
+                delta = 1
+        
+        if delta:
+            nuevo_puntaje = db.registrar_clic_puntaje(
+                sesion['id'],
+                apellido,
+                nombre,
+                delta,
+                puntaje,
+                sesion['puntaje_maximo'],
+                diferido
+            )
+            if nuevo_puntaje is not None:
+                puntaje = st.session_state[clave] = nuevo_puntaje
+        
+        with col2:
+            st.markdown(f"""
+                <div style='
+                    font-size: 20px;
+                    font-weight: bold;
+                    color: #0066cc;
+                    text-align: center;
+                    background-color: white;
+                    padding: 4px 10px;
+                    border-radius: 6px;
+                    box-shadow: 0 1px 2px rgba(0,0,0,0.1);
+                '>
+                    {puntaje} / {sesion['puntaje_maximo']}
+                </div>
+            """, unsafe_allow_html=True)
 
 def mostrar_vista_tabla_edicion(db, df_puntajes, sesion):
     """Vista de tabla para edición de puntajes"""
@@ -175,7 +306,22 @@ def mostrar_vista_tabla_edicion(db, df_puntajes, sesion):
     df_puntajes['index'] = df_puntajes['index'] + 1
     df_puntajes = df_puntajes.rename(columns={'index': 'N°'})
     
-    df_editado = st.data_editor(
+    # Fallos del último guardado, que se hizo justo antes de volver a ejecutar la página
+    fallos = st.session_state.pop(f"fallos_editor_{sesion['id']}", None)
+    if fallos:
+        st.warning(f"No se pudieron guardar {len(fallos)} puntajes")
+        st.dataframe(pd.DataFrame(fallos), hide_index=True)
+    
+    # El editor se recrea con otra clave después de guardar para descartar sus ediciones
+    version = st.session_state.get(f"version_editor_{sesion['id']}", 0)
+    clave_editor = f"editor_sesion_{sesion['id']}_{version}"
+    
+    # edited_rows indica posiciones de la tabla dibujada en la ejecución anterior
+    clave_alumnos = f"{clave_editor}_alumnos"
+    alumnos_dibujados = st.session_state.get(clave_alumnos)
+    st.session_state[clave_alumnos] = list(zip(df_puntajes['Apellido'], df_puntajes['Nombre']))
+    
+    st.data_editor(
         df_puntajes,
         column_config={
             "N°": st.column_config.NumberColumn(
@@ -200,14 +346,24 @@ def mostrar_vista_tabla_edicion(db, df_puntajes, sesion):
             )
         },
         hide_index=True,
-        key=f"editor_sesion_{sesion['id']}"
+        key=clave_editor
     )
     
-    # Actualizar puntajes
-    for _, row in df_editado.iterrows():
-        db.actualizar_puntaje_en_sesion(
-            sesion['id'],
-            row['Apellido'],
-            row['Nombre'],
-            row['Puntaje']
-        )
\ No newline at end of file
+    # Guardar solo las celdas que el usuario editó, identificando al alumno por nombre
+    ediciones = st.session_state.get(clave_editor, {}).get('edited_rows', {})
+    alumnos_dibujados = alumnos_dibujados or st.session_state[clave_alumnos]
+    df_cambios = pd.DataFrame([
+        {'Apellido': alumnos_dibujados[int(posicion)][0],
+         'Nombre': alumnos_dibujados[int(posicion)][1],
+         'Puntaje': valores['Puntaje']}
+        for posicion, valores in ediciones.items()
+        if 'Puntaje' in valores and int(posicion) < len(alumnos_dibujados)
+    ], columns=['Apellido', 'Nombre', 'Puntaje'])
+    
+    if not df_cambios.empty and validar_puntaje_maximo(df_cambios, sesion['puntaje_maximo']):
+        # Las ediciones se agrupan en la unidad de trabajo y se envían en un solo lote
+        fallos = db.registrar_puntajes_sesion(sesion['id'], df_cambios) + db.confirmar_escrituras()
+        st.session_state[f"fallos_editor_{sesion['id']}"] = fallos
+        st.session_state[f"version_editor_{sesion['id']}"] = version + 1
+        st.session_state.pop(clave_alumnos, None)
+        st.rerun()
\ No newline at end of file
@@ -0,0 +1,212 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+# Filas por inserción masiva (PostgREST acepta lotes grandes; SQLite los divide por sentencia)
+TAMANO_LOTE_INSERCION = 1000
+
+APELLIDOS = [
+    'García', 'Rodríguez', 'González', 'Fernández', 'López', 'Martínez', 'Sánchez', 'Pérez',
+    'Gómez', 'Martín', 'Jiménez', 'Ruiz', 'Hernández', 'Díaz', 'Moreno', 'Muñoz', 'Álvarez',
+    'Romero', 'Alonso', 'Gutiérrez', 'Navarro', 'Torres', 'Domínguez', 'Vázquez', 'Ramos',
+    'Gil', 'Ramírez', 'Serrano', 'Blanco', 'Molina', 'Morales', 'Suárez', 'Ortega', 'Delgado',
+    'Castro', 'Ortiz', 'Rubio', 'Marín', 'Sanz', 'Núñez', 'Iglesias', 'Medina', 'Garrido',
+    'Cortés', 'Castillo', 'Santos', 'Lozano', 'Guerrero', 'Cano', 'Prieto', 'Méndez', 'Cruz',
+    'Flores', 'Herrera', 'Peña', 'León', 'Márquez', 'Cabrera', 'Vargas', 'Quispe', 'Mamani',
+    'Huamán', 'Chávez', 'Rojas', 'Mendoza', 'Salazar', 'Paredes', 'Ríos', 'Espinoza', 'Vega'
+]
+
+NOMBRES = [
+    'Juan', 'María', 'José', 'Ana', 'Luis', 'Carmen', 'Carlos', 'Laura', 'Jorge', 'Lucía',
+    'Miguel', 'Sofía', 'Pedro', 'Valeria', 'Diego', 'Camila', 'Andrés', 'Daniela', 'Fernando',
+    'Gabriela', 'Ricardo', 'Paula', 'Alejandro', 'Andrea', 'Javier', 'Natalia', 'Manuel',
+    'Isabel', 'Sergio', 'Rosa', 'Raúl', 'Elena', 'Pablo', 'Patricia', 'Víctor', 'Claudia',
+    'Hugo', 'Mariana', 'Álvaro', 'Fiorella', 'Renzo', 'Milagros', 'Gonzalo', 'Ximena',
+    'Martín', 'Alessandra', 'Sebastián', 'Jimena', 'Rodrigo', 'Luciana'
+]
+
+MATERIAS = [
+    'Inteligencia Artificial y Machine Learning', 'Sistemas Integrados Empresariales',
+    'Agilidad Empresarial', 'Business Analytics', 'Transformación Digital',
+    'Gestión de Proyectos', 'Disrupción Tecnológica', 'Estadística Aplicada',
+    'Ciencia de Datos', 'Arquitectura Empresarial', 'Gestión de la Calidad', 'Finanzas Corporativas'
+]
+
+INSTITUCIONES = ['UPN', 'UNI', 'MBA Tech', 'SNI', 'MBA Pacifico']
+
+# Puntajes máximos posibles de una sesión y su frecuencia relativa
+PUNTAJES_MAXIMOS = [5, 10, 10, 15, 20, 20]
+
+# Probabilidad de que un alumno no participe en una sesión (puntaje 0)
+PROBABILIDAD_AUSENCIA = 0.08
+
+
+def _insertar(cliente, tabla, filas):
+    """Inserta filas en lotes y retorna las filas creadas"""
+    creadas = []
+    for inicio in range(0, len(filas), TAMANO_LOTE_INSERCION):
+        creadas.extend(cliente.table(tabla).insert(filas[inicio:inicio + TAMANO_LOTE_INSERCION]).execute().data)
+    return creadas
+
+
+def generar_padron(alumnos, rng):
+    """Pares (apellido, nombre) distintos con dos apellidos al estilo hispano"""
+    combinaciones = len(APELLIDOS) * len(APELLIDOS) * len(NOMBRES)
+    if alumnos > combinaciones:
+        raise ValueError(f"No se pueden generar más de {combinaciones} alumnos distintos por curso")
+
+    indices = rng.choice(combinaciones, size=alumnos, replace=False)
+    paterno, resto = np.divmod(indices, len(APELLIDOS) * len(NOMBRES))
+    materno, nombre = np.divmod(resto, len(NOMBRES))
+    return [
+        (f"{APELLIDOS[p]} {APELLIDOS[m]}", NOMBRES[n])
+        for p, m, n in zip(paterno, materno, nombre)
+    ]
+
+
+def generar_fechas(sesiones, inicio, rng):
+    """Fechas de clase en días hábiles, separadas por 2 a 7 días"""
+    fechas = []
+    fecha = inicio
+    for _ in range(sesiones):
+        while fecha.weekday() >= 5:
+            fecha += timedelta(days=1)
+        fechas.append(fecha)
+        fecha += timedelta(days=int(rng.integers(2, 8)))
+    return fechas
+
+
+def generar_puntajes(alumnos, maximos, rng):
+    """
+    Matriz sesiones×alumnos de puntajes con distribución sesgada:
+    cada alumno tiene un rendimiento base Beta(5, 2) y cada sesión una dificultad
+    """
+    maximos = np.asarray(maximos)
+    habilidad = rng.beta(5, 2, size=alumnos)
+    dificultad = rng.normal(0, 0.08, size=len(maximos))
+    probabilidad = np.clip(
+        habilidad[None, :] - dificultad[:, None] + rng.normal(0, 0.1, size=(len(maximos), alumnos)),
+        0, 1
+    )
+    puntajes = rng.binomial(maximos[:, None], probabilidad)
+    puntajes[rng.random(puntajes.shape) < PROBABILIDAD_AUSENCIA] = 0
+    return puntajes
+
+
+def dividir_evaluaciones(sesiones, evaluaciones):
+    """Anchos de evaluaciones consecutivas que cubren las sesiones, más un final con todas"""
+    if sesiones == 0 or evaluaciones == 0:
+        return []
+    base, extra = divmod(sesiones, min(evaluaciones, sesiones))
+    anchos = [base + (k < extra) for k in range(min(evaluaciones, sesiones))]
+    return anchos + [sesiones]
+
+
+def generar_curso(cliente, codigo, nombre, alumnos, sesiones, anchos_evaluaciones=None,
+                  inicio=date(2024, 3, 4), semilla=0):
+    """
+    Crea un curso con su padrón, sesiones con puntajes y evaluaciones usando inserciones masivas
+    anchos_evaluaciones: sesiones consecutivas de cada evaluación (la que cubre todas es el final)
+    Retorna los IDs creados
+    """
+    rng = np.random.default_rng(semilla)
+    if anchos_evaluaciones is None:
+        anchos_evaluaciones = dividir_evaluaciones(sesiones, 3)
+
+    curso_id = _insertar(cliente, 'cursos', [{'nombre': nombre, 'codigo': codigo}])[0]['id']
+
+    ids_alumnos = [fila['id'] for fila in _insertar(cliente, 'alumnos', [
+        {'curso_id': curso_id, 'apellido': apellido, 'nombre': nombre_alumno}
+        for apellido, nombre_alumno in generar_padron(alumnos, rng)
+    ])]
+
+    fechas = generar_fechas(sesiones, inicio, rng)
+    maximos = rng.choice(PUNTAJES_MAXIMOS, size=sesiones)
+    ids_sesiones = [fila['id'] for fila in _insertar(cliente, 'sesiones', [
+        {
+            'curso_id': curso_id,
+            'nombre': f"Sesión {k + 1}",
+            'fecha': fecha.isoformat(),
+            'puntaje_maximo': int(maximo)
+        }
+        for k, (fecha, maximo) in enumerate(zip(fechas, maximos))
+    ])]
+
+    puntajes = generar_puntajes(alumnos, maximos, rng)
+    _insertar(cliente, 'puntajes', [
+        {'sesion_id': sesion_id, 'alumno_id': alumno_id, 'puntaje': int(puntaje)}
+        for sesion_id, fila in zip(ids_sesiones, puntajes.tolist())
+        for alumno_id, puntaje in zip(ids_alumnos, fila)
+    ])
+
+    ids_evaluaciones, vinculos = [], []
+    desde = 0
+    for numero, ancho in enumerate(anchos_evaluaciones, start=1):
+        if ancho >= sesiones and len(anchos_evaluaciones) > 1:
+            seleccion, nombre_evaluacion = ids_sesiones, 'Examen Final'
+        else:
+            desde = desde if desde + ancho <= sesiones else 0
+            seleccion, nombre_evaluacion = ids_sesiones[desde:desde + ancho], f"Evaluación Parcial {numero}"
+            desde += ancho
+        if not seleccion:
+            continue
+
+        evaluacion_id = _insertar(cliente, 'evaluaciones', [{
+            'curso_id': curso_id,
+            'nombre': nombre_evaluacion,
+            'escala': 20,
+            'fecha': (fechas[ids_sesiones.index(seleccion[-1])] + timedelta(days=1)).isoformat()
+        }])[0]['id']
+        ids_evaluaciones.append(evaluacion_id)
+        vinculos.extend({'evaluacion_id': evaluacion_id, 'sesion_id': sesion_id} for sesion_id in seleccion)
+    _insertar(cliente, 'evaluaciones_sesiones', vinculos)
+
+    return {
+        'curso_id': curso_id,
+        'alumnos': ids_alumnos,
+        'sesiones': ids_sesiones,
+        'evaluaciones': ids_evaluaciones
+    }
+
+
+def codigos_disponibles(cliente, prefijo, cantidad):
+    """
+    Pares (número, código) para `cantidad` cursos nuevos con códigos prefijo001, prefijo002...
+    Los códigos que ya existen en el backend se saltan
+    """
+    disponibles, numero = [], 0
+    while len(disponibles) < cantidad:
+        candidatos = {f"{prefijo}{n:03d}": n for n in range(numero + 1, numero + 1 + cantidad - len(disponibles))}
+        numero += len(candidatos)
+        ocupados = {
+            fila['codigo'] for fila in
+            cliente.table('cursos').select('codigo').in_('codigo', list(candidatos)).execute().data
+        }
+        disponibles += [(n, codigo) for codigo, n in candidatos.items() if codigo not in ocupados]
+    return disponibles
+
+
+def generar_datos(cliente, cursos, alumnos, sesiones, evaluaciones=3, prefijo='SIN', semilla=0):
+    """
+    Crea `cursos` cursos sintéticos de `alumnos` alumnos y `sesiones` sesiones cada uno
+    Si un código ya existe (por ejemplo, al repetir la carga) se usa el siguiente libre
+    Retorna la cantidad de filas creadas por tabla
+    """
+    rng = np.random.default_rng(semilla)
+    anchos = dividir_evaluaciones(sesiones, evaluaciones)
+    totales = {'cursos': 0, 'alumnos': 0, 'sesiones': 0, 'puntajes': 0, 'evaluaciones': 0}
+
+    for numero, codigo in codigos_disponibles(cliente, prefijo, cursos):
+        anio, semestre = 2023 + numero % 3, 1 + numero % 2
+        nombre = f"{rng.choice(INSTITUCIONES)} {rng.choice(MATERIAS)} {anio}-{semestre}"
+        inicio = date(anio, 3 if semestre == 1 else 8, 1)
+        creado = generar_curso(
+            cliente, codigo, nombre, alumnos, sesiones, anchos,
+            inicio, int(rng.integers(2**31))
+        )
+        totales['cursos'] += 1
+        totales['alumnos'] += len(creado['alumnos'])
+        totales['sesiones'] += len(creado['sesiones'])
+        totales['puntajes'] += len(creado['alumnos']) * len(creado['sesiones'])
+        totales['evaluaciones'] += len(creado['evaluaciones'])
+    return totales
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+from .validators import generar_reporte_evaluacion
+
+
+def evaluar_escenarios(matriz, maximos, escenarios):
+    """
+    Calcula las notas de varios escenarios de calificación en una sola pasada
+    matriz: puntajes alumnos×sesiones; maximos: puntaje máximo por sesión
+    Cada escenario es un dict con 'escala', 'sesiones' (máscara o índices de columnas)
+    y opcionalmente 'descartar_peores' (sesiones de menor rendimiento a ignorar por alumno)
+    Retorna un arreglo alumnos×escenarios con la misma fórmula que calcular_nota_final
+    """
+    matriz = np.asarray(matriz, dtype=float)
+    maximos = np.asarray(maximos, dtype=float)
+    num_sesiones = matriz.shape[1]
+    
+    seleccion = np.zeros((len(escenarios), num_sesiones), dtype=bool)
+    for k, escenario in enumerate(escenarios):
+        seleccion[k, escenario['sesiones']] = True
+    escalas = np.array([escenario['escala'] for escenario in escenarios], dtype=float)
+    # Siempre se conserva al menos una sesión
+    descartes = np.array([escenario.get('descartar_peores', 0) for escenario in escenarios], dtype=int)
+    descartes = np.clip(np.minimum(descartes, seleccion.sum(axis=1) - 1), 0, None)
+    
+    # Rendimiento por sesión; las sesiones no seleccionadas quedan al final del orden
+    rendimiento = np.divide(matriz, maximos, out=np.zeros_like(matriz), where=maximos > 0)
+    rendimiento = np.where(seleccion[None, :, :], rendimiento[:, None, :], np.inf)
+    rango = rendimiento.argsort(axis=2, kind='stable').argsort(axis=2, kind='stable')
+    incluidas = seleccion[None, :, :] & (rango >= descartes[None, :, None])
+    
+    totales = np.einsum('ns,nks->nk', matriz, incluidas)
+    maximos_incluidos = np.einsum('s,nks->nk', maximos, incluidas)
+    porcentaje = np.divide(
+        totales * 100, maximos_incluidos,
+        out=np.zeros_like(totales), where=maximos_incluidos > 0
+    )
+    return np.round(porcentaje * escalas / 100, 2)
+
+def nombres_unicos(nombres, reservados=('Apellido', 'Nombre')):
+    """
+    Hace únicos los nombres de escenarios agregando ' (2)', ' (3)'... a los repetidos
+    Los nombres reservados (columnas de alumnos) también se consideran ocupados
+    """
+    usados = set(reservados)
+    resultado = []
+    for nombre in nombres:
+        unico, n = nombre, 1
+        while unico in usados:
+            n += 1
+            unico = f"{nombre} ({n})"
+        usados.add(unico)
+        resultado.append(unico)
+    return resultado
+
+def comparar_escenarios(df_alumnos, matriz, maximos, escenarios):
+    """
+    Compara escenarios de calificación sobre un mismo libro de calificaciones
+    Retorna un diccionario con 'comparacion' (estadísticas por escenario),
+    'notas' (nota de cada alumno por escenario) y 'deltas' (diferencia contra el primero)
+    Los nombres repetidos se distinguen con nombres_unicos para que ninguna columna se pierda
+    """
+    notas = evaluar_escenarios(matriz, maximos, escenarios)
+    nombres = nombres_unicos([escenario['nombre'] for escenario in escenarios])
+    alumnos = {
+        'Apellido': df_alumnos['apellido'].to_numpy(),
+        'Nombre': df_alumnos['nombre'].to_numpy()
+    }
+    
+    comparacion = pd.DataFrame([
+        generar_reporte_evaluacion(pd.DataFrame({'Nota': notas[:, k]}))
+        for k in range(len(escenarios))
+    ], index=pd.Index(nombres, name='Escenario'))
+    
+    df_notas = pd.DataFrame({**alumnos, **dict(zip(nombres, notas.T))})
+    df_deltas = pd.DataFrame({**alumnos, **dict(zip(nombres, (notas - notas[:, [0]]).T))})
+    
+    return {
+        'comparacion': comparacion,
+        'notas': df_notas,
+        'deltas': df_deltas
+    }
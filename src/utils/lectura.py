@@ -0,0 +1,118 @@
+import csv
+import io
+import pandas as pd
+from openpyxl import load_workbook
+
+# Columnas del padrón que se conservan del archivo; el resto se descarta al leer
+COLUMNAS_ALUMNOS = ['Apellido', 'Nombre']
+
+# Filas por bloque al leer archivos grandes
+TAMANO_BLOQUE_LECTURA = 1000
+
+# Separadores aceptados en texto pegado (hojas de cálculo pegan con tabulaciones)
+DELIMITADORES = ',;\t'
+
+# Caracteres que se usan para detectar el separador
+TAMANO_MUESTRA = 4096
+
+
+def _verificar_columnas(columnas):
+    """Lanza ValueError si faltan columnas del padrón"""
+    faltantes = [col for col in COLUMNAS_ALUMNOS if col not in columnas]
+    if faltantes:
+        raise ValueError(f"El archivo debe contener las columnas: {', '.join(COLUMNAS_ALUMNOS)}")
+
+
+def leer_csv_por_bloques(archivo, tamano: int = TAMANO_BLOQUE_LECTURA):
+    """
+    Lee un CSV por bloques de `tamano` filas
+    Solo se parsean las columnas Apellido y Nombre (ignorando espacios en los encabezados)
+    """
+    lector = pd.read_csv(
+        archivo,
+        usecols=lambda col: str(col).strip() in COLUMNAS_ALUMNOS,
+        dtype=str,
+        chunksize=tamano
+    )
+    with lector:
+        for bloque in lector:
+            bloque = bloque.rename(columns=lambda col: str(col).strip())
+            _verificar_columnas(bloque.columns)
+            yield bloque[COLUMNAS_ALUMNOS]
+
+
+def leer_excel_por_bloques(archivo, tamano: int = TAMANO_BLOQUE_LECTURA):
+    """
+    Lee la primera hoja de un libro Excel en modo solo lectura, fila por fila
+    Se toman los encabezados de la primera fila y se omiten las filas vacías
+    """
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        encabezados = [str(celda).strip() if celda is not None else '' for celda in next(filas, ())]
+        _verificar_columnas(encabezados)
+        posiciones = [encabezados.index(col) for col in COLUMNAS_ALUMNOS]
+        
+        bloque = []
+        for fila in filas:
+            valores = [fila[pos] if pos < len(fila) else None for pos in posiciones]
+            if all(valor is None for valor in valores):
+                continue
+            bloque.append([None if valor is None else str(valor) for valor in valores])
+            if len(bloque) == tamano:
+                yield pd.DataFrame(bloque, columns=COLUMNAS_ALUMNOS)
+                bloque = []
+        if bloque:
+            yield pd.DataFrame(bloque, columns=COLUMNAS_ALUMNOS)
+    finally:
+        libro.close()
+
+
+def leer_alumnos_por_bloques(archivo, nombre: str, tamano: int = TAMANO_BLOQUE_LECTURA):
+    """Elige el lector por la extensión del archivo"""
+    if nombre.lower().endswith('.csv'):
+        return leer_csv_por_bloques(archivo, tamano)
+    return leer_excel_por_bloques(archivo, tamano)
+
+
+def decodificar_texto(datos) -> str:
+    """Convierte bytes a texto probando UTF-8 (con o sin BOM) y luego Latin-1"""
+    if isinstance(datos, str):
+        return datos.lstrip('\ufeff')
+    try:
+        return datos.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return datos.decode('latin-1')
+
+
+def detectar_delimitador(muestra: str) -> str:
+    """Detecta el separador del texto; si no es concluyente, usa el más frecuente del encabezado"""
+    try:
+        return csv.Sniffer().sniff(muestra, delimiters=DELIMITADORES).delimiter
+    except csv.Error:
+        encabezado = muestra.split('\n', 1)[0]
+        return max(DELIMITADORES, key=encabezado.count)
+
+
+def leer_texto_por_bloques(datos, tamano: int = TAMANO_BLOQUE_LECTURA):
+    """
+    Lee texto delimitado (pegado o subido) por bloques de `tamano` filas
+    Respeta comillas, por lo que un nombre puede contener el separador
+    """
+    texto = decodificar_texto(datos)
+    lector = csv.reader(io.StringIO(texto), delimiter=detectar_delimitador(texto[:TAMANO_MUESTRA]))
+    
+    encabezados = [col.strip() for col in next(lector, [])]
+    _verificar_columnas(encabezados)
+    posiciones = [encabezados.index(col) for col in COLUMNAS_ALUMNOS]
+    
+    bloque = []
+    for fila in lector:
+        if not any(valor.strip() for valor in fila):
+            continue
+        bloque.append([fila[pos] if pos < len(fila) else None for pos in posiciones])
+        if len(bloque) == tamano:
+            yield pd.DataFrame(bloque, columns=COLUMNAS_ALUMNOS)
+            bloque = []
+    if bloque:
+        yield pd.DataFrame(bloque, columns=COLUMNAS_ALUMNOS)
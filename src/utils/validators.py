@@ -1,13 +1,104 @@
 import streamlit as st
 
 import streamlit as st
+import numpy as np
 import pandas as pd
+import unicodedata
 
 
+def normalizar_nombre(texto):
+    """Normaliza un nombre para compararlo: sin espacios extra ni distinción de mayúsculas"""
+    texto = unicodedata.normalize('NFC', str(texto))
+    return ' '.join(texto.split()).casefold()
+
+def clave_alumno(apellido, nombre):
+    """Clave normalizada (apellido, nombre) para indexar alumnos"""
+    return (normalizar_nombre(apellido), normalizar_nombre(nombre))
+
+def _normalizar_columna(serie: pd.Series) -> pd.Series:
+    """Versión vectorizada de normalizar_nombre para una columna completa"""
+    return (
+        serie.astype(str)
+        .str.normalize('NFC')
+        .str.replace(r'\s+', ' ', regex=True)
+        .str.strip()
+        .str.casefold()
+    )
+
+def claves_normalizadas(df: pd.DataFrame) -> pd.Series:
+    """Clave normalizada "apellido␟nombre" de cada fila, para detectar duplicados"""
+    return _normalizar_columna(df['Apellido']) + '\x1f' + _normalizar_columna(df['Nombre'])
+
+def _reporte_errores(mascara, columna, error) -> pd.DataFrame:
+    """Filas del reporte [Fila, Columna, Error] donde la máscara es verdadera"""
+    mascara = np.asarray(mascara, dtype=bool)
+    if isinstance(error, pd.Series):
+        error = error.to_numpy()[mascara]
+    return pd.DataFrame({
+        'Fila': np.flatnonzero(mascara) + 1,
+        'Columna': columna,
+        'Error': error
+    })
+
+def _unir_reportes(partes) -> pd.DataFrame:
+    reporte = pd.concat(partes, ignore_index=True)
+    return reporte.sort_values('Fila', kind='stable').reset_index(drop=True)
+
+def validar_alumnos(df: pd.DataFrame, vistos=None) -> pd.DataFrame:
+    """
+    Valida un padrón columna por columna y retorna un reporte [Fila, Columna, Error]
+    con un renglón por problema (Fila cuenta desde 1; 0 si falta una columna)
+    vistos: claves normalizadas aceptadas antes (por ejemplo, en bloques anteriores)
+    """
+    faltantes = [col for col in ['Apellido', 'Nombre'] if col not in df.columns]
+    if faltantes:
+        return pd.DataFrame({'Fila': 0, 'Columna': faltantes, 'Error': 'Columna faltante'})
+    
+    partes = []
+    vacias = np.zeros(len(df), dtype=bool)
+    for columna in ['Apellido', 'Nombre']:
+        nulos = df[columna].isna().to_numpy()
+        espacios = ~nulos & (df[columna].astype(str).str.strip() == '').to_numpy()
+        partes.append(_reporte_errores(nulos, columna, 'Vacío'))
+        partes.append(_reporte_errores(espacios, columna, 'Solo espacios'))
+        vacias |= nulos | espacios
+    
+    # Duplicados por nombre normalizado, sin contar las filas vacías
+    claves = claves_normalizadas(df).to_numpy()
+    duplicados = np.zeros(len(df), dtype=bool)
+    duplicados[~vacias] = pd.Series(claves[~vacias]).duplicated().to_numpy()
+    if vistos:
+        duplicados |= ~vacias & pd.Series(claves).isin(vistos).to_numpy()
+    partes.append(_reporte_errores(duplicados, 'Apellido, Nombre', 'Alumno duplicado'))
+    
+    return _unir_reportes(partes)
+
+def validar_puntajes(df: pd.DataFrame, puntaje_maximo, columna: str = 'Puntaje') -> pd.DataFrame:
+    """
+    Valida los puntajes columna por columna y retorna un reporte [Fila, Columna, Error]
+    puntaje_maximo: un valor para todas las filas o una Serie alineada con df
+    """
+    numeros = pd.to_numeric(df[columna], errors='coerce')
+    maximos = pd.Series(puntaje_maximo, index=df.index)
+    
+    no_numero = numeros.isna()
+    no_entero = ~no_numero & (numeros % 1 != 0)
+    negativos = numeros < 0
+    excedidos = numeros > maximos
+    
+    return _unir_reportes([
+        _reporte_errores(no_numero, columna, 'No es un número'),
+        _reporte_errores(no_entero, columna, 'No es un entero'),
+        _reporte_errores(negativos, columna, 'Negativo'),
+        _reporte_errores(excedidos, columna, 'Excede el máximo (' + maximos.astype(str) + ')')
+    ])
+
 def validar_puntaje_maximo(df: pd.DataFrame, puntaje_maximo: int) -> bool:
-    """Valida que ningún puntaje exceda el máximo permitido"""
-    if df['puntaje'].max() > puntaje_maximo:
-        st.error(f"Error: Algunos puntajes exceden el máximo permitido ({puntaje_maximo})")
+    """Valida que los puntajes sean enteros entre 0 y el máximo permitido"""
+    errores = validar_puntajes(df, puntaje_maximo)
+    if not errores.empty:
+        st.error(f"Error: Algunos puntajes no son válidos (deben ser enteros entre 0 y {puntaje_maximo})")
+        st.dataframe(errores, hide_index=True)
         return False
     return True
 
@@ -68,3 +159,72 @@ def generar_reporte_evaluacion(df_resultados):
         'total_alumnos': len(df_resultados)
     }
 
+
+
+def construir_matriz_puntajes(df_alumnos, df_sesiones, df_puntajes):
+    """Construye la matriz alumnos×sesiones de puntajes (0 donde no hay registro)"""
+    matriz = np.zeros((len(df_alumnos), len(df_sesiones)), dtype=np.int64)
+    if df_puntajes.empty:
+        return matriz
+    
+    filas = pd.Index(df_alumnos['id']).get_indexer(df_puntajes['alumno_id'])
+    columnas = pd.Index(df_sesiones['id']).get_indexer(df_puntajes['sesion_id'])
+    validos = (filas >= 0) & (columnas >= 0)
+    puntajes = df_puntajes['puntaje'].fillna(0).to_numpy(dtype=np.int64)
+    
+    np.add.at(matriz, (filas[validos], columnas[validos]), puntajes[validos])
+    return matriz
+
+def calcular_resultados_evaluacion(df_alumnos, df_sesiones, df_puntajes, escala):
+    """
+    Calcula en una sola pasada los resultados de una evaluación
+    Retorna un diccionario con 'resultados', 'por_alumno' y 'por_sesion'
+    """
+    matriz = construir_matriz_puntajes(df_alumnos, df_sesiones, df_puntajes)
+    maximos = df_sesiones['puntaje_maximo'].fillna(0).to_numpy(dtype=np.int64)
+    
+    puntaje_total = matriz.sum(axis=1)
+    puntaje_maximo = int(maximos.sum())
+    if puntaje_maximo > 0:
+        porcentaje = puntaje_total / puntaje_maximo * 100
+    else:
+        porcentaje = np.zeros(len(df_alumnos))
+    
+    resultados = pd.DataFrame({
+        'Apellido': df_alumnos['apellido'].to_numpy(),
+        'Nombre': df_alumnos['nombre'].to_numpy(),
+        'Puntaje Total': puntaje_total,
+        'Puntaje Máximo': puntaje_maximo,
+        'Porcentaje': np.round(porcentaje, 2),
+        'Nota': np.round(porcentaje * escala / 100, 2)
+    })
+    
+    # Desglose por alumno: una columna por sesión
+    por_alumno = pd.DataFrame(
+        matriz,
+        index=pd.MultiIndex.from_arrays(
+            [df_alumnos['apellido'], df_alumnos['nombre']],
+            names=['Apellido', 'Nombre']
+        ),
+        columns=df_sesiones['id'].to_numpy()
+    )
+    
+    # Desglose por sesión
+    promedio = matriz.mean(axis=0) if len(df_alumnos) else np.zeros(len(df_sesiones))
+    por_sesion = pd.DataFrame({
+        'sesion_id': df_sesiones['id'].to_numpy(),
+        'Puntaje Máximo': maximos,
+        'Promedio': np.round(promedio, 2),
+        'Porcentaje Promedio': np.round(
+            np.divide(promedio * 100, maximos, out=np.zeros(len(maximos)), where=maximos > 0), 2
+        )
+    })
+    for columna in ('nombre', 'fecha'):
+        if columna in df_sesiones.columns:
+            por_sesion[columna.capitalize()] = df_sesiones[columna].to_numpy()
+    
+    return {
+        'resultados': resultados,
+        'por_alumno': por_alumno,
+        'por_sesion': por_sesion
+    }
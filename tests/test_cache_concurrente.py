@@ -0,0 +1,43 @@
+import threading
+
+from src.config.almacenamiento_sqlite import ClienteSQLite
+from src.config.cliente_envuelto import ClienteEnvuelto
+from src.config.supabase_manager import SupabaseManager
+from src.utils.datos_sinteticos import generar_curso
+
+
+def test_lectura_obsoleta_no_queda_en_cache():
+    """
+    A lee los puntajes de una sesión, B incrementa un puntaje antes de que A
+    termine y la siguiente lectura debe ver el valor nuevo
+    """
+    base = ClienteSQLite()
+    creado = generar_curso(base, 'CACHE', 'Curso de prueba', 3, 1, [1])
+    sesion_id, alumno_id = creado['sesiones'][0], creado['alumnos'][0]
+    base.table('puntajes').update({'puntaje': 1}).eq('sesion_id', sesion_id).eq('alumno_id', alumno_id).execute()
+
+    leida = threading.Event()
+    escrita = threading.Event()
+
+    def al_ejecutar(solicitud, ejecutar):
+        respuesta = ejecutar()
+        # Solo se detiene la lectura de puntajes del hilo A, ya ejecutada en la base
+        if threading.current_thread().name == 'lector' and solicitud['tabla'] == 'puntajes':
+            leida.set()
+            assert escrita.wait(5)
+        return respuesta
+
+    db = SupabaseManager(ClienteEnvuelto(base, al_ejecutar))
+    alumno = base.table('alumnos').select('apellido, nombre').eq('id', alumno_id).single().execute().data
+
+    lector = threading.Thread(target=db.obtener_puntajes_sesion, args=(sesion_id,), name='lector')
+    lector.start()
+    assert leida.wait(5)
+    nuevo = db.incrementar_puntaje(sesion_id, alumno['apellido'], alumno['nombre'], 1)
+    escrita.set()
+    lector.join(5)
+
+    assert nuevo == 2
+    df = db.obtener_puntajes_sesion(sesion_id)
+    fila = df[(df['Apellido'] == alumno['apellido']) & (df['Nombre'] == alumno['nombre'])]
+    assert fila['Puntaje'].iloc[0] == 2
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from src.utils.escenarios import comparar_escenarios, nombres_unicos
+
+ALUMNOS = pd.DataFrame({'apellido': ['García', 'López'], 'nombre': ['Ana', 'Luis']})
+MATRIZ = np.array([[5, 10], [10, 0]])
+MAXIMOS = np.array([10, 10])
+
+
+def test_nombres_unicos():
+    assert nombres_unicos(['Base', 'Base', 'Otro', 'Base']) == ['Base', 'Base (2)', 'Otro', 'Base (3)']
+    assert nombres_unicos(['Nombre', 'Base (2)', 'Base', 'Base']) == ['Nombre (2)', 'Base (2)', 'Base', 'Base (3)']
+
+
+def test_escenarios_con_el_mismo_nombre_no_pierden_columnas():
+    escenarios = [
+        {'nombre': 'Base', 'escala': 20, 'sesiones': [0, 1]},
+        {'nombre': 'Base', 'escala': 20, 'sesiones': [0]},
+        {'nombre': 'Apellido', 'escala': 10, 'sesiones': [1]}
+    ]
+    resultado = comparar_escenarios(ALUMNOS, MATRIZ, MAXIMOS, escenarios)
+
+    nombres = ['Base', 'Base (2)', 'Apellido (2)']
+    assert list(resultado['comparacion'].index) == nombres
+    assert list(resultado['notas'].columns) == ['Apellido', 'Nombre'] + nombres
+    assert list(resultado['deltas'].columns) == ['Apellido', 'Nombre'] + nombres
+    assert list(resultado['notas']['Apellido']) == ['García', 'López']
+    assert list(resultado['notas']['Base']) == [15.0, 10.0]
+    assert list(resultado['notas']['Base (2)']) == [10.0, 20.0]
+    assert list(resultado['notas']['Apellido (2)']) == [10.0, 0.0]
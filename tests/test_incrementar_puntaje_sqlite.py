@@ -0,0 +1,63 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.config.almacenamiento_sqlite import ClienteSQLite, _leer_sql
+
+PUNTAJE_MAXIMO = 10
+
+
+@pytest.fixture
+def conexion():
+    conexion = sqlite3.connect(':memory:')
+    conexion.executescript(_leer_sql('esquema_sqlite.sql'))
+    conexion.execute("insert into cursos (id, nombre, codigo) values (1, 'Curso', 'C1')")
+    conexion.execute("insert into alumnos (id, curso_id, apellido, nombre) values (1, 1, 'García', 'Ana')")
+    conexion.execute(
+        "insert into sesiones (id, curso_id, nombre, fecha, puntaje_maximo) values (1, 1, 'Sesión 1', '2024-03-04', ?)",
+        (PUNTAJE_MAXIMO,)
+    )
+    yield conexion
+    conexion.close()
+
+
+def incrementar(conexion, delta):
+    sql = _leer_sql('incrementar_puntaje_sqlite.sql')
+    return conexion.execute(sql, {'sesion_id': 1, 'alumno_id': 1, 'delta': delta}).fetchone()[0]
+
+
+def test_acumula_deltas(conexion):
+    assert incrementar(conexion, 3) == 3
+    assert incrementar(conexion, 2) == 5
+    assert incrementar(conexion, -1) == 4
+    assert conexion.execute('select count(*) from puntajes').fetchone()[0] == 1
+
+
+def test_acota_en_cero(conexion):
+    assert incrementar(conexion, -1) == 0
+    assert incrementar(conexion, 2) == 2
+    assert incrementar(conexion, -5) == 0
+
+
+def test_acota_en_puntaje_maximo(conexion):
+    assert incrementar(conexion, PUNTAJE_MAXIMO + 5) == PUNTAJE_MAXIMO
+    assert incrementar(conexion, 1) == PUNTAJE_MAXIMO
+    assert incrementar(conexion, -1) == PUNTAJE_MAXIMO - 1
+
+
+def test_deltas_concurrentes_no_se_pierden():
+    cliente = ClienteSQLite()
+    cliente.table('cursos').insert({'nombre': 'Curso', 'codigo': 'C1'}).execute()
+    cliente.table('alumnos').insert({'curso_id': 1, 'apellido': 'García', 'nombre': 'Ana'}).execute()
+    cliente.table('sesiones').insert(
+        {'curso_id': 1, 'nombre': 'Sesión 1', 'fecha': '2024-03-04', 'puntaje_maximo': 100}
+    ).execute()
+
+    def clic(_):
+        cliente.rpc('incrementar_puntaje', {'p_sesion_id': 1, 'p_alumno_id': 1, 'p_delta': 1}).execute()
+
+    with ThreadPoolExecutor(max_workers=8) as ejecutor:
+        list(ejecutor.map(clic, range(60)))
+
+    assert cliente.table('puntajes').select('puntaje').execute().data == [{'puntaje': 60}]